@@ -0,0 +1,138 @@
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from checkers.bitboard import BitBoard, move_notation
+from checkers.constants import AI_PLAYER
+from checkers import settings
+from minimax.algorithm import aspiration_search, SearchLimits
+from minimax.transposition import TranspositionTable
+from minimax.ordering import MoveOrdering
+from minimax.stats import SearchStats
+from minimax.tablebase import Tablebase
+
+# Searches a fixed set of positions to fixed depths and reports the time and nodes of every depth, to compare the speed of the search between changes.
+# Every position is searched like the game does: depth 1, 2, 3... with the same transposition table, move ordering and aspiration windows.
+# The random digit of the evaluation is seeded, so the same code always searches the same nodes.
+# Usage: python bench.py [--depth N] [--output FILE] [--compare FILE] [--tablebase]
+
+# Position name: (FEN, depth). The AI plays the side to move.
+POSITIONS = {
+    'opening': ("B:W19,21,22,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12", 10),
+    'early': ("B:W12,15,21,23,24,25,26,27,28,29,31,32:B1,2,3,4,5,6,7,8,11,13", 11),
+    'middle': ("B:W14,17,18,21,22,23,27,28,30,32:B1,3,4,5,6,7,9,11,12,15", 11),
+    'kings': ("B:WK5,18,22,27:B10,14,K24,26", 11),
+    'king endgame': ("B:WK2,K30:BK9,K13,20", 8),
+}
+SEED = 2021
+
+def bench_position(fen, max_depth, tablebase=None):
+# Returns the results of every depth in order, and the stats of all of them
+    position, turn = BitBoard.from_fen(fen)
+    if turn != AI_PLAYER:
+        raise ValueError(f"The AI doesn't play the side to move in {fen!r}")
+
+    random.seed(SEED)
+    table = TranspositionTable(settings.transposition_table_size)
+    ordering = MoveOrdering()
+    stats = SearchStats()
+    table.new_search()
+    ordering.new_search()
+
+    results = []
+    total_time = total_nodes = 0
+    value = None
+    for depth in range(1, max_depth + 1):
+        limits = SearchLimits()
+        pv = []
+        start = time.perf_counter()
+        value, best_move = aspiration_search(position, depth, value, table, limits, ordering, stats, tablebase, pv)
+        elapsed = time.perf_counter() - start
+        stats.finished_iteration(depth, limits.nodes)
+
+        total_time += elapsed
+        total_nodes += limits.nodes
+        results.append({
+            'depth': depth,
+            'time': elapsed,
+            'time_to_depth': total_time, # Including the shallower searches, like the game
+            'nodes': limits.nodes,
+            'nodes_per_second': limits.nodes / elapsed if elapsed else 0,
+            'best_move': move_notation(best_move) if best_move is not None else None,
+            'pv': [move_notation(move) for move in pv],
+            'score': value if math.isfinite(value) else str(value),
+            'effective_branching_factor': stats.effective_branching_factor(),
+        })
+
+        # A won or lost game won't change with a deeper search
+        if not math.isfinite(value):
+            break
+
+    return results, stats
+
+def run(depth=None, tablebase=None):
+    report = {
+        'settings': {name: getattr(settings, name) for name in ('advanced_evalaute', 'free_king_movement', 'backwards_eating_in_doubles', 'srufim', 'transposition_table_size')},
+        'tablebase': tablebase.pieces if tablebase is not None else None,
+        'positions': {},
+    }
+    total_time = total_nodes = 0
+
+    for name, (fen, max_depth) in POSITIONS.items():
+        results, stats = bench_position(fen, depth or max_depth, tablebase)
+        last = results[-1]
+        total_time += last['time_to_depth']
+        total_nodes += sum(result['nodes'] for result in results)
+        report['positions'][name] = {'fen': fen, 'depths': results, 'stats': stats.to_dict()}
+
+        print(f"{name:13} depth {last['depth']}: {last['time_to_depth']:6.2f}s {last['nodes']:>8} nodes ({last['nodes_per_second']:,.0f} nodes/s), "
+              f"branching factor {last['effective_branching_factor']:.2f}, best {last['best_move']} score {last['score']}")
+
+    report['total'] = {'time': total_time, 'nodes': total_nodes, 'nodes_per_second': total_nodes / total_time if total_time else 0}
+    print(f"{'total':13} {total_time:6.2f}s {total_nodes} nodes ({report['total']['nodes_per_second']:,.0f} nodes/s)")
+
+    return report
+
+def compare(report, old_report):
+# Prints how the time and nodes changed from an older run, for the positions and depths both have
+    print("Compared to the older run:")
+
+    for name, position in report['positions'].items():
+        old_position = old_report['positions'].get(name)
+        if old_position is None or old_position['fen'] != position['fen']:
+            continue
+
+        depth = min(len(position['depths']), len(old_position['depths']))
+        new, old = position['depths'][depth - 1], old_position['depths'][depth - 1]
+        time_change = new['time_to_depth'] / old['time_to_depth'] if old['time_to_depth'] else math.inf
+        nodes_change = sum(result['nodes'] for result in position['depths'][:depth]) / max(sum(result['nodes'] for result in old_position['depths'][:depth]), 1)
+        same = '' if (new['best_move'], new['score']) == (old['best_move'], old['score']) else f" (was {old['best_move']} {old['score']})"
+
+        print(f"{name:13} depth {depth}: time x{time_change:.2f}, nodes x{nodes_change:.2f}{same}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the search on a fixed set of positions.")
+    parser.add_argument('--depth', type=int, help="Overrides the depth of the positions")
+    parser.add_argument('--output', help="Writes the results as JSON to this file")
+    parser.add_argument('--compare', help="A JSON file of an older run to compare to")
+    parser.add_argument('--tablebase', action='store_true', help="Searches with the endgame tablebase of the settings")
+    args = parser.parse_args()
+
+    tablebase = Tablebase.open() if args.tablebase else None
+    if args.tablebase and tablebase is None:
+        sys.exit("The tablebase wasn't generated, run: python -m minimax.tablebase")
+
+    report = run(args.depth, tablebase)
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            compare(report, json.load(file))
+
+if __name__ == '__main__':
+    main()
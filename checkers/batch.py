@@ -0,0 +1,132 @@
+import math
+import random
+from .bitboard import EDGE_SCORES, WHITE_KINGS_ROW, BLACK_KINGS_ROW
+from .rays import RAYS, FORWARD, ALL_DIRECTIONS
+from .constants import WHITE, BLACK, AI_PLAYER
+
+# NumPy is optional: without it the search evaluates one position at a time
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Evaluates many positions at once with NumPy, giving the same scores as BitBoard.simple_evaluate and advanced_evaluate.
+# The positions are given as uint32 arrays of their white, black and kings masks, and are worked on as masks like BitBoard does,
+# with the squares next to every square found by shifting the masks.
+
+MIN_BATCH = 24 # With less positions, evaluating them one by one is faster than NumPy's overhead
+
+def _shift_amounts(offsets):
+# Right and left shifts that move every square offset squares back, so a square's bit is where the square offset squares away from it was
+    return np.array([max(offset, 0) for offset in offsets], dtype=np.uint32), np.array([max(-offset, 0) for offset in offsets], dtype=np.uint32)
+
+def _build_shifts():
+# Groups the squares by how far the next square is in every direction, and the one behind it, so every group is checked with one shift.
+# Returns arrays with an entry for every group: its squares, the shifts to the next square and the square behind it, and whether every color moves in its direction.
+    groups = {}
+    for direction in ALL_DIRECTIONS:
+        for square, ray in enumerate(RAYS):
+            ray = ray[direction]
+            if len(ray) > 1:
+                key = (direction, ray[0] - square, ray[1] - square)
+            elif len(ray) == 1:
+                key = (direction, ray[0] - square, None) # No square behind it, so no captures
+            else:
+                continue
+            groups[key] = groups.get(key, 0) | 1 << square
+
+    keys = list(groups)
+    squares = np.array([groups[key] for key in keys], dtype=np.uint32)
+    capture_squares = np.array([groups[key] if key[2] is not None else 0 for key in keys], dtype=np.uint32)
+    neighbor_shifts = _shift_amounts([offset for _, offset, _ in keys])
+    jump_shifts = _shift_amounts([jump_offset or 0 for _, _, jump_offset in keys])
+    forward = {color: np.array([direction in directions for direction, _, _ in keys]) for color, directions in FORWARD.items()}
+    return squares, capture_squares, neighbor_shifts, jump_shifts, forward
+
+def _build_score_weights():
+# The squares of every edge score, and the weight of every mask advanced_evaluate_masks counts:
+# the AI's pieces, the enemy's pieces, the AI's kings, the enemy's kings and the AI's pieces on the squares of every edge score
+    masks = {}
+    for square, score in enumerate(EDGE_SCORES):
+        masks[score] = masks.get(score, 0) | 1 << square
+    weights = [3 * 1000, -3 * 1000, 5 * 1000, -5 * 1000] + [score * 10 for score in masks]
+    return np.array(list(masks.values()), dtype=np.uint32), np.array(weights, dtype=np.int64)
+
+if np is not None:
+    _SQUARES, _CAPTURE_SQUARES, _NEIGHBOR_SHIFTS, _JUMP_SHIFTS, _FORWARD = _build_shifts()
+    _EDGE_MASKS, _SCORE_WEIGHTS = _build_score_weights()
+    _BYTE_COUNTS = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+
+def available():
+    return np is not None
+
+def _popcount(masks):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype(np.int64)
+    return sum(_BYTE_COUNTS[(masks >> shift) & 0xFF] for shift in (0, 8, 16, 24))
+
+def _shift(masks, shifts):
+# Shifts the masks by every group's shifts, to a (positions, groups) array
+    right, left = shifts
+    return (masks[:, None] >> right) << left
+
+def _can_move(friendly, enemy, kings, color):
+# Returns which positions the color has at least one move in, the same as BitBoard.has_any_legal_move
+    empty = ~(friendly | enemy)
+    movers = np.where(_FORWARD[color], friendly[:, None], (friendly & kings)[:, None])
+
+    moves = _SQUARES & _shift(empty, _NEIGHBOR_SHIFTS)
+    captures = _CAPTURE_SQUARES & _shift(enemy, _NEIGHBOR_SHIFTS) & _shift(empty, _JUMP_SHIFTS)
+    return ((movers & (moves | captures)) != 0).any(axis=1)
+
+def simple_evaluate_masks(white, black, kings):
+# Returns a list of the scores of the positions
+    white_left, black_left = _popcount(white), _popcount(black)
+    white_kings, black_kings = _popcount(white & kings), _popcount(black & kings)
+
+    if AI_PLAYER == BLACK:
+        scores = black_left - white_left + (black_kings * 0.5 - white_kings * 0.5)
+    else:
+        scores = white_left - black_left + (white_kings * 0.5 - black_kings * 0.5)
+    return scores.tolist()
+
+def advanced_evaluate_masks(white, black, kings):
+# Returns a list of the scores of the positions, without advanced_evaluate's random digit, which is added by add_random_digit
+# only to the scores that are used, so the random numbers are drawn in the same order as when evaluating one by one.
+    friendly, enemy = (white, black) if AI_PLAYER == WHITE else (black, white)
+
+    counted = np.concatenate((np.stack((friendly, enemy, friendly & kings, enemy & kings), axis=1), friendly[:, None] & _EDGE_MASKS), axis=1)
+    scores = _popcount(counted) @ _SCORE_WEIGHTS
+    can_move = _can_move(friendly, enemy, kings, AI_PLAYER)
+
+    return [score if moves else -math.inf for score, moves in zip(scores.tolist(), can_move.tolist())]
+
+def add_random_digit(score):
+    if score == -math.inf:
+        return score
+    return score + random.randrange(0, 10)
+
+def children_masks(position, moves):
+# Returns the white, black and kings masks of the positions after every move, as arrays, the same as BitBoard.make_move
+    origins, targets, captured = np.array(moves, dtype=np.uint32).T
+    origin_bits, target_bits = np.uint32(1) << origins, np.uint32(1) << targets
+    white, black, kings = np.uint32(position.white), np.uint32(position.black), np.uint32(position.kings)
+
+    if white & origin_bits[0]:
+        white, black = white ^ origin_bits ^ target_bits, black & ~captured
+        promotes = target_bits & np.uint32(WHITE_KINGS_ROW)
+    else:
+        white, black = white & ~captured, black ^ origin_bits ^ target_bits
+        promotes = target_bits & np.uint32(BLACK_KINGS_ROW)
+
+    # A king moves with its piece, and a piece that reaches the kings row becomes one
+    moved_kings = np.where((kings & origin_bits) != 0, origin_bits ^ target_bits, promotes)
+    kings = (kings ^ moved_kings) & ~captured
+    return white, black, kings
+
+def evaluate_children(position, moves, advanced):
+# Returns the scores of the positions after every move, of one color. See advanced_evaluate_masks for the random digit.
+    white, black, kings = children_masks(position, moves)
+    if advanced:
+        return advanced_evaluate_masks(white, black, kings)
+    return simple_evaluate_masks(white, black, kings)
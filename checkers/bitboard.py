@@ -0,0 +1,335 @@
+import math
+import random
+from .utility import position_to_square, square_to_position, squares_of, edge_score, parse_fen, make_fen, read_fens
+from .constants import ROWS, COLS, WHITE, BLACK, AI_PLAYER
+from .zobrist import PIECE_KEYS, WHITE_PIECE, WHITE_KING, BLACK_PIECE, BLACK_KING, hash_masks
+from .board import Board
+from .settings import free_king_movement, srufim
+from .rays import SQUARES, RAYS, ALL_DIRECTIONS, FORWARD, SHORT_CONTINUATIONS, KING_CONTINUATIONS
+
+# Bit number n of a mask is set if there's a piece on square n
+FULL_MASK = (1 << SQUARES) - 1
+
+EDGE_SCORES = tuple(edge_score(*square_to_position(square)) for square in range(SQUARES))
+
+# Kings row for each color: white is promoted on the top row, black on the bottom row
+WHITE_KINGS_ROW = sum(1 << position_to_square(0, col) for col in range(1, COLS, 2))
+BLACK_KINGS_ROW = sum(1 << position_to_square(ROWS - 1, col) for col in range(0, COLS, 2))
+
+def captures_of(move):
+# Returns the number of pieces captured in a move
+    return move[2].bit_count()
+
+def mirror_mask(mask):
+# Turns the board around: square n becomes square 31 - n
+    return int(f"{mask:0{SQUARES}b}"[::-1], 2)
+
+def mirror_move(move):
+# The same move on the mirrored board, see BitBoard.mirrored
+    origin, target, captured = move
+    return SQUARES - 1 - origin, SQUARES - 1 - target, mirror_mask(captured)
+
+def move_notation(move):
+# For example: "22-18" for a move, "22x15" for a capture
+    origin, target, captured = move
+    return f"{origin + 1}{'x' if captured else '-'}{target + 1}"
+
+
+class BitBoard:
+    # A compact position for the search: every color and the kings are masks of the 32 playable squares.
+    # Moves are (origin square, target square, mask of captured pieces) tuples.
+    __slots__ = ('white', 'black', 'kings', 'hash', 'white_edges', 'black_edges')
+
+    def __init__(self, white, black, kings, hash=None, edges=None):
+        self.white = white
+        self.black = black
+        self.kings = kings
+        self.hash = hash_masks(white, black, kings) if hash is None else hash # Zobrist hash, updated with every move
+        # The edge scores of every color's pieces, for the advanced evaluation, updated with every move like the hash
+        if edges is None:
+            edges = (sum(EDGE_SCORES[square] for square in squares_of(white)), sum(EDGE_SCORES[square] for square in squares_of(black)))
+        self.white_edges, self.black_edges = edges
+
+    @classmethod
+    def from_board(cls, board):
+    # Creates a bitboard from a Board
+        white = black = kings = 0
+
+        for row in board.board:
+            for piece in row:
+                if piece is not None:
+                    bit = 1 << position_to_square(piece.row, piece.col)
+                    if piece.color == WHITE:
+                        white |= bit
+                    else:
+                        black |= bit
+                    if piece.king:
+                        kings |= bit
+
+        return cls(white, black, kings, board.hash, (board.white_edges, board.black_edges))
+
+    def to_board(self):
+    # Creates a Board from the bitboard, so it can be used by the game
+        board = Board(None)
+        board.create_board(self.pieces())
+        return board
+
+    @classmethod
+    def from_fen(cls, fen):
+    # Returns the bitboard of the FEN and the side to move
+        turn, pieces = parse_fen(fen)
+        white = black = kings = 0
+
+        for color, king, square in pieces:
+            bit = 1 << square
+            if (white | black) & bit:
+                raise ValueError(f"Two pieces on square {square + 1}")
+            if color == WHITE:
+                white |= bit
+            else:
+                black |= bit
+            if king:
+                kings |= bit
+
+        return cls(white, black, kings), turn
+
+    @classmethod
+    def load_fens(cls, path):
+    # Returns a (bitboard, side to move) for every FEN in a file, one per line
+        return [cls.from_fen(fen) for fen in read_fens(path)]
+
+    def get_fen(self, turn):
+        return make_fen(turn, self.pieces())
+
+    def pieces(self):
+    # Returns a list of (color, king, square) for every piece
+        kings = self.kings
+        return [(color, bool(kings >> square & 1), square) for color, mask in ((WHITE, self.white), (BLACK, self.black)) for square in squares_of(mask)]
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and (self.white, self.black, self.kings) == (other.white, other.black, other.kings)
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return f"BitBoard(white={self.white:#010x}, black={self.black:#010x}, kings={self.kings:#010x})"
+
+    def get_pieces(self, color):
+        return self.white if color == WHITE else self.black
+
+    def get_enemy_pieces(self, color):
+        return self.black if color == WHITE else self.white
+
+    def is_promotion(self, move):
+    # Checks if a move makes a piece a king
+        origin, target, _ = move
+        if self.kings & (1 << origin):
+            return False
+        if self.white & (1 << origin):
+            return bool((1 << target) & WHITE_KINGS_ROW)
+        return bool((1 << target) & BLACK_KINGS_ROW)
+
+    def simple_evaluate(self):
+    # Returns score for minimax algorithim, the same as Board.simple_evaluate
+        white_left, black_left = self.white.bit_count(), self.black.bit_count()
+        white_kings, black_kings = (self.white & self.kings).bit_count(), (self.black & self.kings).bit_count()
+
+        if AI_PLAYER == BLACK:
+            return black_left - white_left + (black_kings * 0.5 - white_kings * 0.5)
+        else:
+            return white_left - black_left + (white_kings * 0.5 - black_kings * 0.5)
+
+    def advanced_evaluate(self):
+    # Returns score for minimax algorithim, the same as Board.advanced_evaluate
+        friendly, enemy = self.get_pieces(AI_PLAYER), self.get_enemy_pieces(AI_PLAYER)
+
+        if not self.has_any_legal_move(AI_PLAYER):
+            return -math.inf
+
+        pieces_eval = friendly.bit_count()*3 - enemy.bit_count()*3 + ((friendly & self.kings).bit_count() * 5 - (enemy & self.kings).bit_count() * 5)
+        edges_eval = self.white_edges if AI_PLAYER == WHITE else self.black_edges
+        random_eval = random.randrange(0, 10)
+
+        return (pieces_eval * 1000) + (edges_eval * 10) + random_eval
+
+    def winner(self, turn):
+    # Returns the winning color, or None if the game isn't over. A color that can't move on its turn loses.
+        if not self.white:
+            return BLACK
+        if not self.black:
+            return WHITE
+        if not self.has_any_legal_move(turn):
+            return BLACK if turn == WHITE else WHITE
+        return None
+
+    def has_any_legal_move(self, color):
+    # Checks if a color has at least one move, stopping at the first one found.
+    # Only the squares next to every piece need to be looked at: a move needs an empty square there, and a capture an enemy piece with an empty square behind it.
+        friendly = self.get_pieces(color)
+        enemy = self.get_enemy_pieces(color)
+        empty = ~(self.white | self.black) & FULL_MASK
+
+        for square in squares_of(friendly):
+            king = self.kings & (1 << square)
+            directions = ALL_DIRECTIONS if king else FORWARD[color]
+
+            for direction in directions:
+                ray = RAYS[square][direction]
+                if not ray:
+                    continue
+                if empty & (1 << ray[0]):
+                    return True
+                if enemy & (1 << ray[0]) and len(ray) > 1 and empty & (1 << ray[1]):
+                    return True
+
+        return False
+
+    def get_legal_moves(self, color):
+    # Gets all moves for a color, only keeping the moves with the most captures if srufim is on
+        moves = set()
+        friendly = self.get_pieces(color)
+        enemy = self.get_enemy_pieces(color)
+        occupied = self.white | self.black
+
+        for square in squares_of(friendly):
+            bit = 1 << square
+            # The moving piece leaves its square, so it doesn't block its own captures
+            empty = ~occupied & FULL_MASK | bit
+
+            if self.kings & bit:
+                if free_king_movement:
+                    self._king_moves(square, empty, enemy, moves)
+                else:
+                    self._short_moves(square, ALL_DIRECTIONS, empty, enemy, moves)
+            else:
+                self._short_moves(square, FORWARD[color], empty, enemy, moves)
+
+        if srufim and moves:
+            most = max(captures_of(move) for move in moves)
+            return [move for move in moves if captures_of(move) == most]
+
+        return list(moves)
+
+    def _short_moves(self, origin, directions, empty, enemy, moves):
+    # Moves of a piece that moves a single square at a time
+        for direction in directions:
+            ray = RAYS[origin][direction]
+            if ray and empty & (1 << ray[0]):
+                moves.add((origin, ray[0], 0))
+
+        self._short_captures(origin, origin, directions, 0, empty, enemy, moves)
+
+    def _short_captures(self, origin, square, directions, captured, empty, enemy, moves):
+    # Captures by jumping over a neighbouring piece. Every landing square is a move, and captures continue from there.
+        for direction in directions:
+            ray = RAYS[square][direction]
+            if len(ray) < 2:
+                continue
+
+            over, land = 1 << ray[0], 1 << ray[1]
+            if enemy & over and not captured & over and empty & land:
+                new_captured = captured | over
+                moves.add((origin, ray[1], new_captured))
+                self._short_captures(origin, ray[1], SHORT_CONTINUATIONS[direction], new_captured, empty, enemy, moves)
+
+    def _king_moves(self, origin, empty, enemy, moves):
+    # Moves of a king that moves freely on the diagonals
+        for direction in ALL_DIRECTIONS:
+            for square in RAYS[origin][direction]:
+                if not empty & (1 << square):
+                    break
+                moves.add((origin, square, 0))
+
+        self._king_captures(origin, origin, ALL_DIRECTIONS, 0, empty, enemy, moves)
+
+    def _king_capture_start(self, ray, empty, enemy):
+    # Returns the index of an enemy piece on the ray that has an empty square behind it, or None
+        for i, square in enumerate(ray):
+            bit = 1 << square
+            if empty & bit:
+                continue
+            if enemy & bit and i + 1 < len(ray) and empty & (1 << ray[i + 1]):
+                return i
+            return None
+
+        return None
+
+    def _king_captures(self, origin, square, directions, captured, empty, enemy, moves):
+    # Captures of a free king: jumps over an enemy piece anywhere on the diagonal, and lands on any empty square behind it.
+    # Captured pieces stay on the board until the move ends, so they can't be jumped over again.
+        for direction in directions:
+            ray = RAYS[square][direction]
+            i = self._king_capture_start(ray, empty, enemy & ~captured)
+            if i is None:
+                continue
+
+            new_captured = captured | (1 << ray[i])
+            for j in range(i + 1, len(ray)):
+                land = ray[j]
+                if not empty & (1 << land):
+                    break
+                moves.add((origin, land, new_captured))
+
+                # Continuing on the same diagonal is the same from every landing square, so only done from the first one
+                continuations = KING_CONTINUATIONS[direction] if j == i + 1 else KING_CONTINUATIONS[direction][1:]
+                self._king_captures(origin, land, continuations, new_captured, empty, enemy, moves)
+
+    def make_move(self, move):
+    # Plays a move in place, and returns what's needed to unmake it
+        origin, target, captured = move
+        origin_bit, target_bit = 1 << origin, 1 << target # The same bit if a king's captures end where it started
+        undo = (self.white, self.black, self.kings, self.hash, self.white_edges, self.black_edges)
+        moved_edges = EDGE_SCORES[target] - EDGE_SCORES[origin]
+
+        if self.white & origin_bit:
+            self.white ^= origin_bit ^ target_bit
+            self.black &= ~captured
+            self.white_edges += moved_edges
+            promotes = target_bit & WHITE_KINGS_ROW
+            piece_kind, king_kind, enemy_piece_kind, enemy_king_kind = WHITE_PIECE, WHITE_KING, BLACK_PIECE, BLACK_KING
+        else:
+            self.black ^= origin_bit ^ target_bit
+            self.white &= ~captured
+            self.black_edges += moved_edges
+            promotes = target_bit & BLACK_KINGS_ROW
+            piece_kind, king_kind, enemy_piece_kind, enemy_king_kind = BLACK_PIECE, BLACK_KING, WHITE_PIECE, WHITE_KING
+
+        if self.kings & origin_bit:
+            self.kings ^= origin_bit ^ target_bit
+            self.hash ^= PIECE_KEYS[king_kind][origin] ^ PIECE_KEYS[king_kind][target]
+        elif promotes:
+            self.kings |= target_bit
+            self.hash ^= PIECE_KEYS[piece_kind][origin] ^ PIECE_KEYS[king_kind][target]
+        else:
+            self.hash ^= PIECE_KEYS[piece_kind][origin] ^ PIECE_KEYS[piece_kind][target]
+
+        captured_edges = 0
+        for square in squares_of(captured):
+            self.hash ^= PIECE_KEYS[enemy_king_kind if self.kings & (1 << square) else enemy_piece_kind][square]
+            captured_edges += EDGE_SCORES[square]
+        self.kings &= ~captured
+        if piece_kind == WHITE_PIECE:
+            self.black_edges -= captured_edges
+        else:
+            self.white_edges -= captured_edges
+
+        return undo
+
+    def unmake_move(self, undo):
+    # Restores the position from before the move, including promotions and captured pieces
+        self.white, self.black, self.kings, self.hash, self.white_edges, self.black_edges = undo
+
+    def copy(self):
+        return BitBoard(self.white, self.black, self.kings, self.hash, (self.white_edges, self.black_edges))
+
+    def mirrored(self):
+    # Returns the position with the board turned around and the colors swapped, where every color has the moves the other color had.
+    # Lets the search, which always plays AI_PLAYER, play the other color.
+        return BitBoard(mirror_mask(self.black), mirror_mask(self.white), mirror_mask(self.kings))
+
+    def after_move(self, move):
+    # Returns a new bitboard with the move played
+        board = self.copy()
+        board.make_move(move)
+        return board
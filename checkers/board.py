@@ -1,73 +1,90 @@
 import math
-import pygame
 import random
-from .utility import position_to_notation
-from .constants import BACKGROUND, TILE, ROWS, COLS, SQUARE_SIZE, WHITE, BLACK, AI_PLAYER
+from .utility import position_to_notation, position_to_square, edge_score, square_to_position, parse_fen, make_fen, read_fens
+from .zobrist import piece_key
+from .constants import ROWS, COLS, WHITE, BLACK, AI_PLAYER, DEFAULT_FEN
 from .piece import Piece
 from .move import Move, Moves
-from .settings import free_king_movement, backwards_eating_in_doubles, srufim
+from .settings import free_king_movement, srufim
+from .rays import DIAGONALS, NEIGHBORS, JUMPS, ALL_DIRECTIONS, FORWARD, SHORT_CONTINUATIONS, KING_CONTINUATIONS
+
+KING_MOVES_CACHE_SIZE = 2**16 # How many positions of free kings _king_moves remembers, cleared when full
+_king_moves_cache = {}
 
 class Board:
-    def __init__(self):
-        self.board = []
+    def __init__(self, fen=DEFAULT_FEN):
+    # None for an empty board
         self.selected_piece = None
-        self.white_left = self.black_left = 12
+        self.create_board(parse_fen(fen)[1] if fen is not None else ())
+
+    @classmethod
+    def from_fen(cls, fen):
+    # Returns the board of the FEN and the side to move
+        turn, pieces = parse_fen(fen)
+        board = cls(None)
+        board.create_board(pieces)
+        return board, turn
+
+    @classmethod
+    def load_fens(cls, path):
+    # Returns a (board, side to move) for every FEN in a file, one per line
+        return [cls.from_fen(fen) for fen in read_fens(path)]
+
+    def get_fen(self, turn):
+        pieces = [(piece.color, piece.king, position_to_square(piece.row, piece.col)) for row in self.board for piece in row if piece is not None]
+        return make_fen(turn, pieces)
+
+    # Creates the pieces in the board, from a list of (color, king, square)
+    def create_board(self, pieces):
+        self.board = [[None] * COLS for _ in range(ROWS)]
+        self.white_left = self.black_left = 0
         self.white_kings = self.black_kings = 0
-
-        self.create_board()
-
-    # Draws the playable squares
-    def draw_squares(self, win):
-        win.fill(BACKGROUND)
-
-        for row in range(ROWS):
-            for col in range(row % 2, ROWS, 2):
-                pygame.draw.rect(win, TILE, (row * SQUARE_SIZE, col * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-
-    # Creates the piece in the board
-    def create_board(self):
-        for row in range(ROWS):
-            self.board.append([])
-            for col in range(COLS):
-                if col % 2 == ((row + 1) % 2):
-                    if row < 3:
-                        self.board[row].append(Piece(row, col, BLACK))
-                    elif row > 4:
-                        self.board[row].append(Piece(row, col, WHITE))
-                    else:
-                        self.board[row].append(None)
-                else:
-                    self.board[row].append(None)
+        self.white_edges = self.black_edges = 0 # The edge scores of every color's pieces, for the advanced evaluation
+        self.hash = 0 # Zobrist hash of the pieces, updated with every move
+
+        for color, king, square in pieces:
+            row, col = square_to_position(square)
+            if self.board[row][col] is not None:
+                raise ValueError(f"Two pieces on square {square + 1}")
+
+            piece = Piece(row, col, color)
+            if king:
+                piece.make_king()
+            self.board[row][col] = piece
+            self.hash ^= piece_key(color, king, square)
+
+            if color == WHITE:
+                self.white_left += 1
+                self.white_kings += king
+                self.white_edges += edge_score(row, col)
+            else:
+                self.black_left += 1
+                self.black_kings += king
+                self.black_edges += edge_score(row, col)
     
     def make_everyone_king(self):
     # Makes all pieces into kings. For testing purposes.
         for pieces in self.board:
             for piece in pieces:
-                if piece is not None:
+                if piece is not None and not piece.king:
+                    self.hash ^= piece_key(piece.color, False, position_to_square(piece.row, piece.col))
                     piece.make_king()
+                    self.hash ^= piece_key(piece.color, True, position_to_square(piece.row, piece.col))
     
-    # Draws the entire board and the pieces
-    def draw(self, win):
-        self.draw_squares(win)
-
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-
-                if piece != None:
-                    piece.draw(win)
-
     def remove(self, pieces):
         for piece in pieces:
             self.board[piece.row][piece.col] = None
+            self.hash ^= piece_key(piece.color, piece.king, position_to_square(piece.row, piece.col))
             if piece.color == WHITE:
                 if piece.king:
                     self.white_kings -= 1
                 self.white_left -= 1
+                self.white_edges -= edge_score(piece.row, piece.col)
             else:
                 if piece.king:
                     self.black_kings -= 1
                 self.black_left -= 1
+                self.black_edges -= edge_score(piece.row, piece.col)
 
     def simple_evaluate(self):
     # Returns score for minimax algorithim
@@ -78,41 +95,44 @@ class Board:
 
     def advanced_evaluate(self):
     # 1111 - First two digits for blacks - whites (regular pieces are worth 3, kings 5), then 2 digits that are higher if more pieces are close to the edges, then a random digit
-        pieces_eval = 0
-        edges_eval = 0
+    # All the terms are kept up to date by every move, so only the check that the AI can move looks at the board
         random_eval = random.randrange(0, 10)
 
-        lose_flag = True
-
         if AI_PLAYER == BLACK:
-            pieces_eval += self.black_left*3 - self.white_left*3 + (self.black_kings * 5 - self.white_kings * 5)
+            pieces_eval = self.black_left*3 - self.white_left*3 + (self.black_kings * 5 - self.white_kings * 5)
+            # Edge eval from 1-4 according to how close to the edge
+            edges_eval = self.black_edges
         else:
-            pieces_eval += self.white_left*3 - self.black_left*3 + (self.white_kings * 5 - self.black_kings * 5)
+            pieces_eval = self.white_left*3 - self.black_left*3 + (self.white_kings * 5 - self.black_kings * 5)
+            edges_eval = self.white_edges
 
-        # Edge eval from 1-4 according to how close to the edge
-        for row in self.board:
-            for piece in row:
-                if piece is not None and piece.color == AI_PLAYER:
-                    if (piece.row == ROWS - 1 or piece.col == COLS - 1) or (piece.col == 0 or piece.row == 0):
-                        edges_eval += 4
-                    elif (piece.row == ROWS - 2 or piece.col == COLS - 2) or (piece.col == 1 or piece.row == 1):
-                        edges_eval += 3
-                    elif (piece.row == ROWS - 3 or piece.col == COLS - 3) or (piece.col == 2 or piece.row == 2):
-                        edges_eval += 2
-                    else:
-                        edges_eval += 1
-
-                    if self.get_valid_moves(piece).can_move(): # If at least one piece can move, then this board isn't a losing one
-                        lose_flag = False
-
-        eval = (pieces_eval * 1000) + (edges_eval * 10) + random_eval
-
-        if lose_flag:
+        # If no piece can move, then this board is a losing one
+        if not self.has_any_legal_move(AI_PLAYER):
             return -math.inf
-        else:
-            return eval
+
+        return (pieces_eval * 1000) + (edges_eval * 10) + random_eval
                     
     
+    def _piece_can_move(self, piece):
+    # Returns if a piece has at least one move, by only looking at the squares around it instead of generating its moves.
+    # A direction the piece moves in has a move if the square next to it is empty, or a capture if it has an enemy piece with an empty square behind it.
+        directions = ALL_DIRECTIONS if piece.king else FORWARD[piece.color]
+        neighbors, jumps = NEIGHBORS[piece.row][piece.col], JUMPS[piece.row][piece.col]
+
+        for direction in directions:
+            neighbor = neighbors[direction]
+            if neighbor is None:
+                continue
+
+            current = self.board[neighbor[0]][neighbor[1]]
+            if current is None:
+                return True
+            jump = jumps[direction]
+            if current.color != piece.color and jump is not None and self.board[jump[0]][jump[1]] is None:
+                return True
+
+        return False
+
     def get_all_pieces(self, color):
         pieces = []
 
@@ -125,6 +145,12 @@ class Board:
 
     # Moves a piece to a given row and col        
     def move(self, piece, row, col):
+        self.hash ^= piece_key(piece.color, piece.king, position_to_square(piece.row, piece.col))
+        if piece.color == WHITE:
+            self.white_edges += edge_score(row, col) - edge_score(piece.row, piece.col)
+        else:
+            self.black_edges += edge_score(row, col) - edge_score(piece.row, piece.col)
+
         # Switches place with the piece in the target location
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         # Checks if needs to be made king
@@ -136,26 +162,72 @@ class Board:
             self.black_kings += 1
 
         piece.move(row, col)
+        self.hash ^= piece_key(piece.color, piece.king, position_to_square(row, col))
+
+    def make_move(self, piece, move):
+    # Moves a piece and removes the pieces it captured. Returns what's needed to unmake the move.
+        undo = (piece, piece.row, piece.col, piece.king, move.skipped, self.hash, self.white_edges, self.black_edges)
+
+        self.move(piece, move.target[0], move.target[1])
+        if move.skipped:
+            self.remove(move.skipped)
+
+        return undo
+
+    def unmake_move(self, undo):
+    # Restores the board from before the move, including promotions and captured pieces
+        piece, row, col, was_king, skipped, self.hash, self.white_edges, self.black_edges = undo
+
+        # Takes back the promotion if the move made the piece a king
+        if piece.king and not was_king:
+            piece.king = False
+            if piece.color == WHITE:
+                self.white_kings -= 1
+            else:
+                self.black_kings -= 1
+
+        self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
+        piece.move(row, col)
+
+        # Puts the captured pieces back
+        for captured in skipped:
+            self.board[captured.row][captured.col] = captured
+            if captured.color == WHITE:
+                if captured.king:
+                    self.white_kings += 1
+                self.white_left += 1
+            else:
+                if captured.king:
+                    self.black_kings += 1
+                self.black_left += 1
 
     # Returns piece in given row and col
     def get_piece(self, row, col):
         return self.board[row][col]
 
     def winner(self, turn):
-        moves_available = self.get_all_moves(turn)
+    # Returns the winning color, or None if the game isn't over. A color that can't move on its turn loses.
+        if (self.white_left) <= 0:
+            return BLACK
+        elif (self.black_left) <= 0:
+            return WHITE
 
         # Checks if a color has ran out of moves
-        if not moves_available.can_move:
+        if not self.has_any_legal_move(turn):
             if turn == WHITE:
                 return BLACK
             else:
                 return WHITE
-        else:
-            if (self.white_left) <= 0:
-                return BLACK
-            elif (self.black_left) <= 0:
-                return WHITE
-            return None
+        return None
+
+    def has_any_legal_move(self, color):
+    # Checks if a color has at least one move, stopping at the first piece that can move. Srufim doesn't matter, since it only picks between moves.
+        for row in self.board:
+            for piece in row:
+                if piece is not None and piece.color == color and self._piece_can_move(piece):
+                    return True
+
+        return False
 
     def get_all_moves(self, color):
     # Gets all moves for a color
@@ -166,342 +238,117 @@ class Board:
         
         return moves
 
-    def filter_srufim(self, color):
-        # Returns a moves object for all moves for all pieces that contain the most amount of captures
-        srufim_moves = self.get_all_moves(color)
-
-        # Only keeps moves with max captures
-        srufim_moves.filter_moves_without_most_captures()
+    def get_legal_moves(self, color):
+        # Returns the moves every piece of a color is allowed to make by the rules, as a dict of piece to its Moves.
+        # Every piece's moves are only generated once, and if srufim is on only the moves with the most captures are kept along the way.
+        legal_moves = {}
+        most_captures = 0
 
-        return srufim_moves
-
-
-    def get_valid_moves(self, piece):
-        moves = Moves()
-        left = piece.col - 1
-        right = piece.col + 1
-        row = piece.row
-
-        if free_king_movement:
-            if not piece.king:
-                if piece.color == WHITE:
-                    moves.add_move(self._traverse_left(row - 1, max(row-3, -1), -1, piece.color, left))
-                    moves.add_move(self._traverse_right(row - 1,  max(row-3, -1), -1, piece.color, right))
-                elif piece.color == BLACK:
-                    moves.add_move(self._traverse_left(row + 1, min(row+3, ROWS), 1, piece.color, left))
-                    moves.add_move(self._traverse_right(row +1, min(row+3, ROWS), 1, piece.color, right))
-            else:
-                moves.add_move(self._traverse_left_king(row - 1, -1, -1, piece.color, left))
-                moves.add_move(self._traverse_right_king(row - 1, -1, -1, piece.color, right))
-                moves.add_move(self._traverse_left_king(row + 1, ROWS, 1, piece.color, left))
-                moves.add_move(self._traverse_right_king(row + 1, ROWS, 1, piece.color, right))
-        else:
-            if piece.color == WHITE or piece.king:
-                moves.add_move(self._traverse_left(row -1, max(row-3, -1), -1, piece.color, left))
-                moves.add_move(self._traverse_right(row -1, max(row-3, -1), -1, piece.color, right))
-            if piece.color == BLACK or piece.king:
-                moves.add_move(self._traverse_left(row +1, min(row+3, ROWS), 1, piece.color, left))
-                moves.add_move(self._traverse_right(row +1, min(row+3, ROWS), 1, piece.color, right))
-
-        return moves
-
-    def _enemy_piece_on_diagonal(self, start, stop, step, color, col, left_or_right): # True for left diagonal, False for right diagonal
-    # Checks if theres an enemy piece with a space behind it on specific diagonal.
-        flag = None
-
-        if left_or_right:
-            col -= 1
-        else:
-            col += 1
-
-        for r in range(start, stop, step):
-            # Breaks if hitting the wall.
-            if col < 0 and left_or_right:
-                break
-            if col >= COLS and not left_or_right:
-                break
-            
-            current = self.board[r][col]
-
-            if current == None:
-            # If the tile is empty and there's an enemy piece beforehand, returns true.
-                if flag:
-                    return True
-            elif current.color == color:
-            # Breaks when hitting a friendly piece.
-                break
-            else:
-            # Declares that an enemy piece has been found and now looking in the next interation to see if the tile after is empty
-                flag = True
-            
-            if left_or_right:
-                col -= 1
-            else:
-                col += 1
-
-        return False
+        for piece in self.get_all_pieces(color):
+            moves = self.get_valid_moves(piece)
 
-    def _traverse_left_king(self, start, stop, step, color, left, skipped=[]):
-    # Checks moves on the left diagonal
-        moves = Moves()
-        last = []
+            if srufim:
+                captures = moves.max_captures()
+                if captures < most_captures:
+                    continue
+                if captures > most_captures:
+                    # All the moves found so far have less captures
+                    most_captures = captures
+                    legal_moves.clear()
+                moves.filter_moves_without_most_captures()
 
-        for r in range(start, stop, step):
-            # Stops when hitting the wall
-            if left < 0:
-                break
+            if moves.can_move():
+                legal_moves[piece] = moves
 
-            current = self.board[r][left]
+        return legal_moves
 
-            if current == None:
-                captured_piece = skipped + last
-                if not last: # Records empty moves 
-                    moves.add_move(Move(r, left, captured_piece))
-                else:
-                    # Checks if a piece has been captured more than once to avoid infinite recursion
-                    if not captured_piece.count(last[0]) > 1:
-                        moves.add_move(Move(r, left, captured_piece))
-
-                    # Checking for double jumps
-                    # Check in the same diagonal:
-                    if self._enemy_piece_on_diagonal(r + step, stop, step, color, left, True):
-                        try:
-                            moves.add_move(self._traverse_left_king(r + step, stop, step, color, left-1, last + skipped))
-                        except RecursionError:
-                            break
-                    if step == -1:
-                    # When moving up:
-                        # Up diagonal:
-                        if self._enemy_piece_on_diagonal(r - 1, -1, -1, color, left, False):
-                            try:
-                                moves.add_move(self._traverse_right_king(r - 1, -1, -1, color, left+1, last + skipped))
-                            except RecursionError:
-                                break
-                        # Down diagonal:
-                        if self._enemy_piece_on_diagonal(r + 1, ROWS, 1, color, left, True):
-                            try:
-                                moves.add_move(self._traverse_left_king(r + 1, ROWS, 1, color, left-1, last + skipped))
-                            except RecursionError:
-                                break
-                    else:
-                    # When moving down:
-                        # Up diagonal:
-                        if self._enemy_piece_on_diagonal(r - 1, -1, -1, color, left, True):
-                            try:
-                                moves.add_move(self._traverse_left_king(r - 1, -1, -1, color, left-1, last + skipped))
-                            except RecursionError:
-                                break
-                            
-                        # Down diagonal:
-                        if self._enemy_piece_on_diagonal(r + 1, ROWS, 1, color, left, False):
-                            try:
-                                moves.add_move(self._traverse_right_king(r + 1, ROWS, 1, color, left+1, last + skipped))
-                            except RecursionError:
-                                break
-
-
-            elif current.color == color:
-            # Breaking when hitting a friendly color
-                break
-            elif last:
-            # Breaking when hitting 2 enemy pieces in a row
-                break
-            else:
-                last = [current]
 
-            left -= 1
-        
-        return moves
+    def get_valid_moves(self, piece):
+        if piece.king and free_king_movement:
+            return self._king_moves(piece)
 
-    def _traverse_right_king(self, start, stop, step, color, right, skipped=[]):
-    # Checks moves on the right diagonal
         moves = Moves()
-        last = []
-
-        for r in range(start, stop, step):
-            # Stops when hitting the wall
-            if right >= COLS:
-                break
-
-            current = self.board[r][right]
-
-            if current == None:
-                captured_piece = skipped + last
-                if not last: # Records empty moves
-                    moves.add_move(Move(r, right, captured_piece))
-                else:
-                    if not captured_piece.count(last[0]) > 1: # Checks if a piece has been captured more than once to avoid infinite recursion
-                        moves.add_move(Move(r, right, captured_piece))
-
-                    # Checking for double jumps
-                    # Check in the same diagonal:
-                    if self._enemy_piece_on_diagonal(r + step, stop, step, color, right, False):
-                        try:
-                            moves.add_move(self._traverse_right_king(r + step, stop, step, color, right+1, last + skipped))
-                        except RecursionError:
-                            break
-
-                    if step == -1:
-                    # When moving up:
-                        # Up diagonal:
-                        if self._enemy_piece_on_diagonal(r - 1, -1, -1, color, right, True):
-                            try:
-                                moves.add_move(self._traverse_left_king(r - 1, -1, -1, color, right-1, last + skipped))
-                            except RecursionError:
-                                break
-                        # Down diagonal:
-                        if self._enemy_piece_on_diagonal(r + 1, ROWS, 1, color, right, False):
-                            try:
-                                moves.add_move(self._traverse_right_king(r + 1, ROWS, 1, color, right+1, last + skipped))
-                            except RecursionError:
-                                break
-                    else:
-                    # When moving down:
-                        # Up diagonal:
-                        if self._enemy_piece_on_diagonal(r - 1, -1, -1, color, right, False):
-                            try:
-                                moves.add_move(self._traverse_right_king(r - 1, -1, -1, color, right+1, last + skipped))
-                            except RecursionError:
-                                break
-                        # Down diagonal:
-                        if self._enemy_piece_on_diagonal(r + 1, ROWS, 1, color, right, True):
-                            try:
-                                moves.add_move(self._traverse_left_king(r + 1, ROWS, 1, color, right-1, last + skipped))
-                            except RecursionError:
-                                break
-
-            elif current.color == color:
-            # Breaking when hitting a friendly color
-                break
-            elif last:
-            # Breaking when hitting 2 enemy pieces in a row
-                break
-            else:
-                last = [current]
-
-            right += 1
+        directions = ALL_DIRECTIONS if piece.king else FORWARD[piece.color]
+        for direction in directions:
+            neighbor = NEIGHBORS[piece.row][piece.col][direction]
+            if neighbor is not None and self.board[neighbor[0]][neighbor[1]] is None:
+                moves.add_move(Move(neighbor[0], neighbor[1], []))
 
+        moves.moves += [Move(row, col, [self.board[r][c] for r, c in captured]) for row, col, captured in self._find_captures(piece, directions)]
         return moves
 
+    def _king_moves(self, piece):
+    # Moves of a king that moves freely on the diagonals. They only depend on where every piece is, so they're memoized by the board's hash
+    # and the king's square, and kings that come back to the same position don't search their captures again.
+        key = (self.hash, position_to_square(piece.row, piece.col))
+        found = _king_moves_cache.get(key)
+        if found is None:
+            if len(_king_moves_cache) >= KING_MOVES_CACHE_SIZE:
+                _king_moves_cache.clear()
+            found = _king_moves_cache[key] = self._find_king_moves(piece)
 
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
         moves = Moves()
-        last = []
-        for r in range(start, stop, step):
-            # Ends the search if hit the left wall
-            if left < 0:
-                break
-
-            current = self.board[r][left]
-
-            # If the target tile is empty
-            if current == None:
-                # If already skipped something and there are no moves left, ends the search
-                if skipped and not last:
-                    break
-                # If already skipped something and there's an option to double jump, adds the next piece to the pieces you can eat
-                elif skipped:
-                    captured_piece = skipped + last
-                    if not last: # Records empty moves
-                        moves.add_move(Move(r, left, captured_piece))
-                    else:
-                        if not captured_piece.count(last[0]) > 1: # Checks if a piece has been captured more than once to avoid infinite recursion
-                            moves.add_move(Move(r, left, captured_piece))
-                else:
-                    # Adds the move
-                    moves.add_move(Move(r, left, last))
-
-                if last:
-                    try:
-                        if step == -1:
-                            row = max(r-3, -1)
-                        else:
-                            row = min(r+3, ROWS)
-
-                        # If there's an option to eat a piece, activates the method again to see if there are any double jumps available
-                        moves.add_move(self._traverse_left(r + step, row, step, color, left-1, skipped = last + skipped))
-                        moves.add_move(self._traverse_right(r + step, row, step, color, left+1, skipped = last + skipped))
-
-                        if backwards_eating_in_doubles:
-                            step = -step
-                            if step == -1:
-                                row = max(r-3, -1)
-                            else:
-                                row = min(r+3, ROWS)
-
-                            moves.add_move(self._traverse_left(r + step, row, step, color, left-1, skipped = last + skipped))
-                            moves.add_move(self._traverse_right(r + step, row, step, color, left+1, skipped = last + skipped))
-                    except RecursionError:
-                        return moves
-                break
-
-            # If the tile is not empty, checks if on it is a same colored piece.
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-
-            left -= 1
-
+        moves.moves = [Move(row, col, [self.board[r][c] for r, c in captured]) for row, col, captured in found]
         return moves
 
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
-        moves = Moves()
-        last = []
-        for r in range(start, stop, step):
-            # Ends the search if hit the right wall
-            if right >= COLS:
-                break
-
-            current = self.board[r][right]
-
-            # If the target tile is empty
-            if current == None:
-                # If already skipped something and there are no moves left, ends the search
-                if skipped and not last:
+    def _find_king_moves(self, piece):
+    # Returns the king's moves as (row, col, (row, col) of every captured piece in order): every empty square on the diagonals, and its captures
+        moves = []
+        for diagonal in DIAGONALS[piece.row][piece.col]:
+            for row, col in diagonal:
+                if self.board[row][col] is not None:
                     break
-                # If already skipped something and there's an option to double jump, adds the next piece to the pieces you can eat
-                elif skipped:
-                    captured_piece = skipped + last
-                    if not last: # Records empty moves
-                        moves.add_move(Move(r, right, captured_piece))
-                    else:
-                        if not captured_piece.count(last[0]) > 1: # Checks if a piece has been captured more than once to avoid infinite recursion
-                            moves.add_move(Move(r, right, captured_piece))
+                moves.append((row, col, ()))
+
+        return moves + self._find_captures(piece, ALL_DIRECTIONS)
+
+    def _find_captures(self, piece, directions):
+    # Returns the piece's captures as (row, col, (row, col) of every captured piece in order). Every landing square is a move, and captures continue from there.
+    # A free king jumps over an enemy piece anywhere on the diagonal and lands on any empty square behind it, and other pieces over a neighbouring piece.
+    # The captures are searched with a stack instead of recursion, and the captured pieces are a mask of their squares:
+    # they stay on the board until the move ends, so they can't be jumped over again.
+        king = piece.king and free_king_movement
+        moves = []
+        found = set() # (row, col, captured mask), since different orders of the same captures are the same move
+
+        # (row, col, directions, captured mask, captured pieces) for every square the captures go on from
+        stack = [(piece.row, piece.col, directions, 0, ())]
+        while stack:
+            row, col, directions, captured_mask, captured = stack.pop()
+
+            for direction in directions:
+                diagonal = DIAGONALS[row][col][direction]
+                # The piece leaves its square, so it doesn't block its own captures
+                over = 0
+                if king:
+                    while over < len(diagonal) and self.board[diagonal[over][0]][diagonal[over][1]] in (None, piece):
+                        over += 1
+                if over + 1 >= len(diagonal):
+                    continue
+
+                enemy_row, enemy_col = diagonal[over]
+                enemy = self.board[enemy_row][enemy_col]
+                bit = 1 << position_to_square(enemy_row, enemy_col)
+                if enemy is None or enemy.color == piece.color or captured_mask & bit:
+                    continue
+
+                new_mask, new_captured = captured_mask | bit, captured + (diagonal[over],)
+                if king:
+                    # Continuing on the same diagonal is the same from every landing square, so only done from the first one
+                    continuations = KING_CONTINUATIONS[direction]
+                    landings = diagonal[over + 1:]
                 else:
-                    # Adds the move
-                    moves.add_move(Move(r, right, last))
-
-                if last:
-                    try:
-                        if step == -1:
-                            row = max(r-3, -1)
-                        else:
-                            row = min(r+3, ROWS)
-
-                        # If there's an option to eat a piece, activates the method again to see if there are any double jumps available
-                        moves.add_move(self._traverse_left(r + step, row, step, color, right-1, skipped = last + skipped))
-                        moves.add_move(self._traverse_right(r + step, row, step, color, right+1, skipped = last + skipped))
-
-                        if backwards_eating_in_doubles:
-                            step = -step
-                            if step == -1:
-                                row = max(r-3, -1)
-                            else:
-                                row = min(r+3, ROWS)
-
-                            moves.add_move(self._traverse_left(r + step, row, step, color, right-1, skipped = last + skipped))
-                            moves.add_move(self._traverse_right(r + step, row, step, color, right+1, skipped = last + skipped))
-                    except RecursionError:
-                        return moves
-                break
-
-            # If the tile is not empty, checks if on it is a same colored piece.
-            elif current.color == color:
-                break
-            else:
-                last = [current]
+                    continuations = SHORT_CONTINUATIONS[direction]
+                    landings = diagonal[over + 1:over + 2]
+
+                for land_row, land_col in landings:
+                    if self.board[land_row][land_col] not in (None, piece):
+                        break
+                    if (land_row, land_col, new_mask) not in found:
+                        found.add((land_row, land_col, new_mask))
+                        moves.append((land_row, land_col, new_captured))
+                    stack.append((land_row, land_col, continuations, new_mask, new_captured))
+                    if king:
+                        continuations = KING_CONTINUATIONS[direction][1:]
 
-            right += 1
-
-        return moves
\ No newline at end of file
+        return moves
@@ -1,8 +1,9 @@
-from pygame.constants import MOUSEMOTION
 from .utility import position_to_notation
 from .constants import WHITE, BLACK
 
 class Move:
+    __slots__ = ('target', 'skipped')
+
     def __init__(self, target_row, target_col, skipped):
         self.target = (target_row, target_col)
         self.skipped = skipped
@@ -19,6 +20,9 @@ class Move:
         
         return True
 
+    def __hash__(self):
+        return hash((self.target, tuple(self.skipped)))
+
     def print_move(self, piece_color, start_not):
         color_string = 'White' if piece_color == WHITE else 'Black'
 
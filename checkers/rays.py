@@ -0,0 +1,50 @@
+from .utility import position_to_square, square_to_position
+from .constants import ROWS, COLS, WHITE, BLACK
+from .settings import backwards_eating_in_doubles
+
+# The diagonals of every square, worked out once when imported, so the move generators of Board and BitBoard look them up
+# instead of stepping through the rows and columns and checking for the walls on every move.
+
+SQUARES = (ROWS * COLS) // 2
+
+# Directions on the board, as (row step, col step)
+UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT = 0, 1, 2, 3
+DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+ALL_DIRECTIONS = (UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT)
+FORWARD = {WHITE: (UP_LEFT, UP_RIGHT), BLACK: (DOWN_LEFT, DOWN_RIGHT)}
+
+# Directions a piece can capture in when continuing a multi capture, according to the direction of the last jump
+if backwards_eating_in_doubles:
+    SHORT_CONTINUATIONS = ((UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT),) * 4
+else:
+    SHORT_CONTINUATIONS = ((UP_LEFT, UP_RIGHT), (UP_LEFT, UP_RIGHT), (DOWN_LEFT, DOWN_RIGHT), (DOWN_LEFT, DOWN_RIGHT))
+# A king with free movement continues on the same diagonal or turns to the perpendicular ones (never backwards)
+KING_CONTINUATIONS = ((UP_LEFT, UP_RIGHT, DOWN_LEFT), (UP_RIGHT, UP_LEFT, DOWN_RIGHT), (DOWN_LEFT, UP_LEFT, DOWN_RIGHT), (DOWN_RIGHT, UP_RIGHT, DOWN_LEFT))
+
+def _build_diagonals():
+# For every playable (row, col) and direction, the (row, col) of the squares on the diagonal going from it until the wall
+    diagonals = [[None] * COLS for _ in range(ROWS)]
+
+    for square in range(SQUARES):
+        row, col = square_to_position(square)
+        square_diagonals = []
+
+        for row_step, col_step in DIRECTIONS:
+            diagonal = []
+            r, c = row + row_step, col + col_step
+            while 0 <= r < ROWS and 0 <= c < COLS:
+                diagonal.append((r, c))
+                r, c = r + row_step, c + col_step
+            square_diagonals.append(tuple(diagonal))
+
+        diagonals[row][col] = tuple(square_diagonals)
+
+    return tuple(tuple(row) for row in diagonals)
+
+# DIAGONALS[row][col][direction]: the (row, col) of the squares on the diagonal, for Board
+DIAGONALS = _build_diagonals()
+# NEIGHBORS[row][col][direction] and JUMPS[row][col][direction]: the (row, col) next to the square and the one behind it, or None past the wall
+NEIGHBORS = tuple(tuple(tuple(diagonal[0] if len(diagonal) > 0 else None for diagonal in square) if square is not None else None for square in row) for row in DIAGONALS)
+JUMPS = tuple(tuple(tuple(diagonal[1] if len(diagonal) > 1 else None for diagonal in square) if square is not None else None for square in row) for row in DIAGONALS)
+# RAYS[square][direction]: the same diagonals as square numbers, for BitBoard
+RAYS = tuple(tuple(tuple(position_to_square(*position) for position in diagonal) for diagonal in DIAGONALS[row][col]) for row, col in map(square_to_position, range(SQUARES)))
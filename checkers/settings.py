@@ -1,5 +1,16 @@
-ai_depth = 4 # How deep does the minimax algorithm go
+ai_depth = 20 # The deepest the minimax algorithm can go
+ai_time_limit = 1 # How many seconds the AI can think on every move. None for no limit
+ai_node_limit = None # How many positions the AI can search on every move. None for no limit
+ai_workers = 1 # How many processes the AI searches with. More than 1 splits every search between them
+ai_pondering = True # Lets the AI think on the human's turn, about the board after the move it expects
+ai_opening_book = True # Plays the AI's first moves from the opening book, once generated with: python -m minimax.book
+ai_book_random = True # Picks between the book's moves at random by their weights, instead of always the best one
 advanced_evalaute = True # Use the advanced formula for the minimax evaluating
+principal_variation_search = True # Searches every move after the first with a zero window, which only proves it isn't better, and searches it again fully if it is
+aspiration_window = 50 # How far from the last depth's score the next depth's search looks, searching again with a wider window if the score is outside. None for always the full window
+batch_evaluation = False # Evaluates the leaves of nodes with many moves all together with NumPy, if installed. Only faster when few of them are cut off
 free_king_movement = True # Makes the king freely move on diagonals, and eat anything in its way (aka Russian/Israeli rules)
-backwards_eating_in_doubles = False # Gives pawns the ability to eat backwards in jumps with multiple captures. Currently not working
-srufim = True # A game rule that makes it mandatory to choose the move with the most captures
\ No newline at end of file
+backwards_eating_in_doubles = False # Gives pawns the ability to eat backwards in jumps with multiple captures
+srufim = True # A game rule that makes it mandatory to choose the move with the most captures
+transposition_table_size = 2**18 # How many searched positions the AI remembers between its moves
+tablebase_pieces = 3 # Positions with this many pieces or less are looked up in the endgame tablebase, once generated with: python -m minimax.tablebase
@@ -1,4 +1,4 @@
-from .constants import ROWS, COLS
+from .constants import ROWS, COLS, WHITE, BLACK
 
 def notation_to_position(notation):
     row = (notation-1) // (ROWS//2)
@@ -22,4 +22,76 @@ def position_to_notation(row, col):
 
     # Only returns if is a whole number after division
     if (notation - int(notation) == 0):
-        return int(notation)
\ No newline at end of file
+        return int(notation)
+
+# The 32 playable squares, numbered like the notation but starting from 0 (square = notation - 1)
+def position_to_square(row, col):
+    return row * (COLS // 2) + col // 2
+
+def square_to_position(square):
+    return notation_to_position(square + 1)
+
+def edge_score(row, col):
+# 4 for the squares on the edge of the board, down to 1 for the ones in the center. Used by the advanced evaluation.
+    return max(4 - min(row, col, ROWS - 1 - row, COLS - 1 - col), 1)
+
+def squares_of(mask):
+# Yields the squares of all the set bits in a mask
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+# FEN: the side to move, then the squares of each color in notation, with a K before kings. For example: "W:W21,22,K30:B1,2,3"
+_FEN_COLORS = {'W': WHITE, 'B': BLACK}
+
+def parse_fen(fen):
+# Returns the side to move and a list of (color, king, square) for every piece. Ranges of squares like "1-4" are allowed too.
+    try:
+        turn, *sections = fen.strip().rstrip('.').split(':')
+        turn = _FEN_COLORS[turn.upper()]
+        pieces = []
+
+        for section in sections:
+            color = _FEN_COLORS[section[0].upper()]
+
+            for token in section[1:].split(','):
+                token = token.strip()
+                if not token:
+                    continue
+                king = token[0] in 'Kk'
+                if king:
+                    token = token[1:]
+
+                if '-' in token:
+                    first, last = token.split('-')
+                    notations = range(int(first), int(last) + 1)
+                else:
+                    notations = (int(token),)
+
+                for notation in notations:
+                    if not 1 <= notation <= (ROWS * COLS) // 2:
+                        raise ValueError(notation)
+                    pieces.append((color, king, notation - 1))
+    except (KeyError, IndexError, ValueError):
+        raise ValueError(f"Invalid FEN: {fen!r}") from None
+
+    return turn, pieces
+
+def make_fen(turn, pieces):
+# The opposite of parse_fen. The squares of each color are written in order.
+    sections = []
+
+    for letter, color in _FEN_COLORS.items():
+        squares = sorted((square, king) for piece_color, king, square in pieces if piece_color == color)
+        sections.append(letter + ','.join(('K' if king else '') + str(square + 1) for square, king in squares))
+
+    return ('W' if turn == WHITE else 'B') + ':' + ':'.join(sections)
+
+def read_fens(path):
+# Yields the FEN on every line of a file, skipping empty lines and lines starting with #
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
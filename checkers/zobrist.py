@@ -0,0 +1,35 @@
+import random
+from .constants import ROWS, COLS, WHITE
+from .utility import squares_of
+
+# Zobrist hashing: every kind of piece on every square gets a random 64 bit key, and a position's hash is the xor of the keys of its pieces.
+# Moving a piece only xors its old and new keys, so the hash can be updated with every move instead of recomputed.
+# The keys are generated from a fixed seed, so hashes are the same between runs and processes.
+SQUARES = (ROWS * COLS) // 2
+
+WHITE_PIECE, WHITE_KING, BLACK_PIECE, BLACK_KING = 0, 1, 2, 3
+
+_random = random.Random(2021)
+PIECE_KEYS = tuple(tuple(_random.getrandbits(64) for _ in range(SQUARES)) for _ in range(4))
+BLACK_TURN_KEY = _random.getrandbits(64)
+
+def piece_key(color, king, square):
+    if color == WHITE:
+        return PIECE_KEYS[WHITE_KING if king else WHITE_PIECE][square]
+    else:
+        return PIECE_KEYS[BLACK_KING if king else BLACK_PIECE][square]
+
+def turn_key(color):
+# Xored into a hash to tell apart the same position with a different color to move
+    return 0 if color == WHITE else BLACK_TURN_KEY
+
+def hash_masks(white, black, kings):
+# Computes the hash of a position from scratch
+    hash = 0
+
+    for kind, mask in ((WHITE_PIECE, white & ~kings), (WHITE_KING, white & kings), (BLACK_PIECE, black & ~kings), (BLACK_KING, black & kings)):
+        keys = PIECE_KEYS[kind]
+        for square in squares_of(mask):
+            hash ^= keys[square]
+
+    return hash
@@ -0,0 +1,22 @@
+import pygame
+from checkers.constants import VOLUME
+pygame.init()
+
+# Loaded when the gui is imported, the engine itself doesn't need pygame
+
+# TEXT
+font = pygame.font.SysFont("Arial", 200, True)
+white_wins_text = font.render("White Wins!", True, pygame.Color('Black'))
+
+# SOUNDS
+def create_sound(path):
+    sound = pygame.mixer.Sound(path)
+    sound.set_volume(VOLUME)
+    return sound
+
+game_start_sound = create_sound('assets/game_start.mp3')
+move_sound = create_sound('assets/move.mp3')
+capture_sound = create_sound('assets/capture.mp3')
+multi_capture_sound = create_sound('assets/multi_capture.mp3')
+king_sound = create_sound('assets/king.mp3')
+game_end_sound = create_sound('assets/game_end.mp3')
@@ -0,0 +1,31 @@
+import pygame
+from checkers.constants import BACKGROUND, TILE, ROWS, SQUARE_SIZE, WHITE, BLACK, PIECE_RADIUS, KING_PADDING
+
+# Draws the playable squares
+def draw_squares(win):
+    win.fill(BACKGROUND)
+
+    for row in range(ROWS):
+        for col in range(row % 2, ROWS, 2):
+            pygame.draw.rect(win, TILE, (row * SQUARE_SIZE, col * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+
+# The pixels of a square
+def square_rect(row, col):
+    return pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+
+# Draws a piece of a color with its center at a pixel position
+def draw_piece(win, color, king, pos):
+    pygame.draw.circle(win, color, pos, PIECE_RADIUS)
+
+    if (king):
+        if (color == WHITE):
+            pygame.draw.circle(win, BLACK, pos, PIECE_RADIUS - KING_PADDING)
+        else:
+            pygame.draw.circle(win, WHITE, pos, PIECE_RADIUS - KING_PADDING)
+        pygame.draw.circle(win, color, pos, PIECE_RADIUS/2)
+
+# A square sized surface with a piece drawn in the middle and the rest transparent, to be copied onto the board
+def piece_sprite(color, king):
+    sprite = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+    draw_piece(sprite, color, king, (SQUARE_SIZE // 2, SQUARE_SIZE // 2))
+    return sprite.convert_alpha()
@@ -1,27 +1,32 @@
 from checkers.utility import position_to_notation
-import pygame
-from .constants import WHITE, BLACK, GREEN_TILE, SQUARE_SIZE, AI_PLAYER, move_sound, capture_sound, multi_capture_sound, game_start_sound, game_end_sound, king_sound
-from .board import Board
-from .move import Move, Moves
-from .settings import srufim
+from checkers.constants import WHITE, BLACK, AI_PLAYER, DEFAULT_FEN
+from checkers.board import Board
+from checkers.settings import transposition_table_size
+from .assets import move_sound, capture_sound, multi_capture_sound, game_start_sound, game_end_sound, king_sound
+from .renderer import Renderer
+from minimax.transposition import TranspositionTable
+from minimax.ordering import MoveOrdering
 
 class Game:
-    def __init__(self, win):
+    def __init__(self, win, fen=DEFAULT_FEN):
+        self.fen = fen # The position the game starts from, and goes back to on reset
         self._init()
         game_start_sound.play()
         self.win = win
+        self.renderer = Renderer(win)
+        # Kept between the AI's moves, since positions and moves searched last move come up again
+        self.transposition_table = TranspositionTable(transposition_table_size)
+        self.move_ordering = MoveOrdering()
 
     def update(self):
-        self.board.draw(self.win)
-        if (self.selected):
-            self.draw_valid_moves()
-        pygame.display.update()
+        highlighted = self.valid_moves if self.selected else ()
+        self.renderer.draw(self.board, highlighted)
 
     def _init(self):
         self.selected = None
-        self.board = Board()
-        self.turn = WHITE
-        self.valid_moves = Moves()
+        self.board, self.turn = Board.from_fen(self.fen)
+        self.valid_moves = {}
+        self._legal_moves = None
 
     def winner(self):
         winner = self.board.winner(self.turn)
@@ -49,7 +54,8 @@ class Game:
         piece = self.board.get_piece(row, col)
         if piece != None and piece.color == self.turn:
             self.selected = piece
-            self.valid_moves = self.board.get_valid_moves(piece)
+            # Only the moves allowed by the rules, so they don't need to be checked again when moving or drawing
+            self.valid_moves = self.legal_moves().get((row, col), {})
             return True
             
         return False
@@ -57,56 +63,48 @@ class Game:
     def _move(self, row, col):
         # This will be the target tile in the target row and col, and will be used to check if the row and col are available
         target_tile = self.board.get_piece(row, col)
-        
-        if srufim:
-            srufim_moves = self.board.filter_srufim(self.turn)
-            move = srufim_moves.get_move(row, col) 
-            if move is None: # If move doesn't exist, then moving failed
-                return False
-        else:
-            move = self.valid_moves.get_move(row, col)
+        move = self.valid_moves.get((row, col))
 
         if self.selected and target_tile == None and move is not None:
             #move.print_move(self.selected.color, position_to_notation(self.selected.row, self.selected.col))
-            self.board.move(self.selected, move.target[0], move.target[1])
+            self.board.make_move(self.selected, move)
+            self.change_turn()
 
             skipped = move.skipped
+            # The game ends when the color that's now to move has no pieces or moves left, which plays the end sound instead.
             # Only plays the moving sounds if no pieces were captured. if a piece was captured, play the capture sound instead.
-            if skipped:
-                self.board.remove(skipped)
-
-                if not self.winner():
-                    if len(skipped) > 1:
-                        multi_capture_sound.play()
-                    else:
-                        capture_sound.play()
-            else:
-                move_sound.play()
-            self.change_turn()
+            if self.winner() is None:
+                if len(skipped) > 1:
+                    multi_capture_sound.play()
+                elif skipped:
+                    capture_sound.play()
+                else:
+                    move_sound.play()
             return True
         else:
             return False
 
-    def draw_valid_moves(self):
-        if srufim:
-            srufim_moves = self.board.filter_srufim(self.turn)
-            for move in self.valid_moves.moves:
-                if srufim_moves.does_move_exist(move):
-                    row, col = move.target[0], move.target[1]
-                    pygame.draw.rect(self.win, GREEN_TILE, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-        else:
-            for move in self.valid_moves.moves:
-                row, col = move.target[0], move.target[1]
-                pygame.draw.rect(self.win, GREEN_TILE, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
-
-
     def change_turn(self):
         if self.turn == WHITE:
             self.turn = BLACK
         else:
             self.turn = WHITE
 
-        self.valid_moves = Moves()
+        self.valid_moves = {}
+        self._legal_moves = None
+
+    def legal_moves(self):
+        # The moves of the color to move, as a dict of every piece's (row, col) to a dict of the (row, col) it can move to to the Move.
+        # Generated once per turn, the first time a piece is selected, and dropped when the position changes.
+        if self._legal_moves is None:
+            self._legal_moves = {}
+            for piece, moves in self.board.get_legal_moves(self.turn).items():
+                targets = self._legal_moves[(piece.row, piece.col)] = {}
+                for move in moves.moves:
+                    # The move is picked by its target, so like Moves.get_move the first move to a square is the one played
+                    targets.setdefault(move.target, move)
+
+        return self._legal_moves
 
     def get_board(self):
         return self.board
@@ -0,0 +1,44 @@
+import pygame
+from checkers.constants import ROWS, COLS, WIDTH, HEIGHT, WHITE, BLACK, GREEN_TILE
+from .drawing import draw_squares, square_rect, piece_sprite
+
+class Renderer:
+    # Draws the game 60 times a second without redrawing what didn't change: the empty board and every kind of piece are drawn once
+    # to surfaces, and every frame only the squares that changed since the last one are copied from them and updated on the screen.
+    def __init__(self, win):
+        self.win = win
+        self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+        draw_squares(self.background)
+        self.sprites = {(color, king): piece_sprite(color, king) for color in (WHITE, BLACK) for king in (False, True)}
+        self.drawn = None # What every square showed in the last frame, or None to draw everything
+
+    def invalidate(self):
+    # Draws everything on the next frame, for when the window lost what was drawn on it
+        self.drawn = None
+
+    def draw(self, board, highlighted=()):
+    # Draws the board with the highlighted squares, as (row, col)
+        squares = []
+        for row in range(ROWS):
+            for col in range(COLS):
+                piece = board.get_piece(row, col)
+                squares.append(((piece.color, piece.king) if piece is not None else None, (row, col) in highlighted))
+
+        if squares == self.drawn:
+            return
+
+        dirty = []
+        for index, (piece, highlight) in enumerate(squares):
+            if self.drawn is not None and self.drawn[index] == (piece, highlight):
+                continue
+
+            rect = square_rect(*divmod(index, COLS))
+            self.win.blit(self.background, rect, rect)
+            if highlight:
+                pygame.draw.rect(self.win, GREEN_TILE, rect)
+            if piece is not None:
+                self.win.blit(self.sprites[piece], rect)
+            dirty.append(rect)
+
+        pygame.display.update(dirty)
+        self.drawn = squares
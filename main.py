@@ -1,16 +1,13 @@
-import pygame
-import math
-from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE, AI_PLAYER, BLACK, WHITE, PAUSE_TIME
-from checkers.game import Game
-from checkers.settings import ai_depth
-from minimax.algorithm import minimax
+from checkers.constants import WIDTH, HEIGHT, SQUARE_SIZE, AI_PLAYER, HUMAN_PLAYER, BLACK, WHITE, PAUSE_TIME
+from checkers.bitboard import BitBoard, move_notation
+from checkers.settings import ai_depth, ai_time_limit, ai_node_limit, ai_workers, ai_pondering, ai_opening_book, ai_book_random
+from minimax.background import BackgroundSearch
+from minimax.parallel import ParallelSearch
+from minimax.tablebase import Tablebase
+from minimax.book import OpeningBook, BookMove
 
 FPS = 60
 
-pygame.init()
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Checkers')
-
 def get_row_col_from_mouse(pos):
     x, y = pos
     row = y // SQUARE_SIZE
@@ -18,33 +15,123 @@ def get_row_col_from_mouse(pos):
 
     return row, col
 
+def start_search(game, ponder, parallel, tablebase, book):
+    # Starts the AI's search of the current board in the background
+    position = BitBoard.from_board(game.get_board())
+
+    # Positions in the opening book aren't searched
+    if book is not None:
+        move = book.choose(position, AI_PLAYER, ai_book_random)
+        if move is not None:
+            if ponder is not None:
+                ponder.cancel()
+            return BookMove(position, move)
+
+    # If the human made the move the AI expected, the search from the human's turn goes on, now with the normal limits
+    if ponder is not None and ponder.position == position:
+        ponder.limits.set_limits(ai_time_limit, ai_node_limit)
+        return ponder
+
+    if ponder is not None:
+        ponder.cancel()
+
+    game.transposition_table.new_search()
+    game.move_ordering.new_search()
+    return BackgroundSearch(position, ai_depth, ai_time_limit, ai_node_limit, game.transposition_table, game.move_ordering, parallel, tablebase)
+
+def start_ponder(game, pv, parallel, tablebase):
+    # Starts searching the board after the move the AI expects from the human, to use the human's turn for thinking.
+    # The expected move is the one after the AI's move in the principal variation of its last search.
+    if len(pv) < 2:
+        return None
+
+    position = BitBoard.from_board(game.get_board())
+    game.transposition_table.new_search()
+    game.move_ordering.new_search()
+    # No limits, it runs until the human moves
+    return BackgroundSearch(position.after_move(pv[1]), ai_depth, None, None, game.transposition_table, game.move_ordering, parallel, tablebase)
+
 def main():
+    # The parallel search's workers are spawned, which imports this file again in each of them, so the window and its sounds are only loaded here
+    import pygame
+    from gui.game import Game
+
+    pygame.init()
+    win = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption('Checkers')
+
     run = True
     clock = pygame.time.Clock()
-    game = Game(WIN)
+    game = Game(win)
+    parallel = ParallelSearch(ai_workers) if ai_workers > 1 else None
+    tablebase = Tablebase.open() # None if it wasn't generated
+    book = OpeningBook.open() if ai_opening_book else None
+    search = None # The AI's search on its turn
+    ponder = None # The AI's search on the human's turn
+    search_start = 0
 
     while run:
         clock.tick(FPS)
 
         if game.turn == AI_PLAYER:
-            pygame.time.wait(PAUSE_TIME)
-            pygame.mixer.pause() # To pause moving sounds during AI calculations
-            value, new_board = minimax(game.get_board(), ai_depth, -math.inf, math.inf, True) # Value currently unused
-            print(value)
-            pygame.mixer.unpause()
-            game.ai_move(new_board)
+            if search is None:
+                # A game that starts with the AI unable to move is already over, and isn't searched
+                if game.winner() is None:
+                    search = start_search(game, ponder, parallel, tablebase, book)
+                    ponder = None
+                    search_start = pygame.time.get_ticks()
+            # Waits at least PAUSE_TIME so the human's move can be seen before the AI's
+            elif search.done() and pygame.time.get_ticks() - search_start >= PAUSE_TIME:
+                value, best_move = search.result # Value currently unused
+                pv = search.pv
+                print(value)
+                print(f"Principal variation: {' '.join(map(move_notation, pv))}")
+                print(search.stats)
+                print(game.transposition_table)
+                print(game.move_ordering)
+                # The search has no move when the AI can't move, which ends the game
+                if best_move is None:
+                    game.winner()
+                else:
+                    game.ai_move(search.position.after_move(best_move).to_board())
+                search = None
+
+                if ai_pondering and game.turn == HUMAN_PLAYER:
+                    ponder = start_ponder(game, pv, parallel, tablebase)
+        elif game.turn is None and ponder is not None:
+            # The game ended on the human's move
+            ponder.cancel()
+            ponder = None
 
         for event in pygame.event.get():
             if (event.type == pygame.QUIT):
                 run = False
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            # The window lost what was drawn on it, like after being covered or minimized
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                game.renderer.invalidate()
+
+            # The human can't move pieces while the AI is thinking
+            if event.type == pygame.MOUSEBUTTONDOWN and game.turn != AI_PLAYER:
                 pos = pygame.mouse.get_pos()
                 row, col = get_row_col_from_mouse(pos)
                 game.select(row, col)
-        
+
         game.update()
 
+    for background_search in (search, ponder):
+        if background_search is not None:
+            background_search.cancel()
+    if parallel is not None:
+        parallel.close()
+    if tablebase is not None:
+        tablebase.close()
+    if book is not None:
+        book.close()
+
     pygame.quit()
 
-main()
\ No newline at end of file
+# The worker processes of the parallel search import this file too, and shouldn't start a game
+if __name__ == '__main__':
+    main()
+
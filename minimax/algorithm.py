@@ -1,16 +1,236 @@
-import pygame
 import math
-from copy import deepcopy
+import time
 from checkers.constants import AI_PLAYER, HUMAN_PLAYER
-from checkers.settings import srufim, advanced_evalaute
+from checkers import batch
+from checkers.bitboard import captures_of
+from checkers.settings import advanced_evalaute, batch_evaluation, principal_variation_search, aspiration_window, transposition_table_size
+from .transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from .ordering import MoveOrdering
+from .stats import SearchStats
+from .tablebase import WIN, DRAW
+
+TABLEBASE_WIN = 10**6 # Higher than any evaluation. Won tablebase positions score this minus how many moves the win takes from the root
+ZERO_WINDOW = 1 # The width of the window principal variation search proves moves worse with. Any score inside it is searched again, so it only needs to be small
+
+class SearchAborted(Exception):
+    # Raised inside the search when it runs out of time or nodes, or is stopped
+    pass
+
+class SearchLimits:
+    # How long a search is allowed to run, in seconds and/or in searched nodes. None means no limit.
+    def __init__(self, time_limit=None, node_limit=None):
+        self.start = time.perf_counter()
+        self.nodes = 0
+        self.stopped = False
+
+        self.set_limits(time_limit, node_limit)
+
+    def set_limits(self, time_limit, node_limit):
+    # Can be changed while searching. The limits count from the start of the search, so a search that's already past them stops right away.
+        self.deadline = self.start + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+
+    def stop(self):
+    # Stops the search from another thread
+        self.stopped = True
+
+    def count_node(self):
+    # Called for every searched node, stops the search if it's out of nodes or time. The clock is only checked every 256 nodes since it's slower.
+        self.nodes += 1
+
+        if self.stopped:
+            raise SearchAborted
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchAborted
+        if self.deadline is not None and self.nodes % 256 == 0 and time.perf_counter() > self.deadline:
+            raise SearchAborted
+
+    def check(self):
+    # Stops the search if it's out of nodes or time, without counting a node
+        if self.stopped:
+            raise SearchAborted
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchAborted
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchAborted
+
+    def time_left(self):
+        return self.deadline - time.perf_counter() if self.deadline is not None else None
+
+    def nodes_left(self):
+        return self.node_limit - self.nodes if self.node_limit is not None else None
+
+def iterative_deepening(position, max_depth, time_limit=None, node_limit=None, table=None, ordering=None, limits=None, parallel=None, stats=None, tablebase=None, pv=None):
+    # Searches at depth 1, 2, 3... until max_depth or until running out of time or nodes, and returns the score and best move of the deepest finished search.
+    # Every search fills the transposition table and the move ordering, so the next one searches the best moves found so far first.
+    # Instead of time and node limits, can be given a SearchLimits to control the search from another thread.
+    # If given a ParallelSearch, the searches are split between its worker processes.
+    # If given a SearchStats, it's filled by all the searches, and every finished one is added to its iterations.
+    # If given a Tablebase, the positions in it aren't searched.
+    # If given a list, it's filled with the principal variation of the deepest finished search.
+    if table is None:
+        table = TranspositionTable(transposition_table_size)
+    if ordering is None:
+        ordering = MoveOrdering()
+    if limits is None:
+        limits = SearchLimits(time_limit, node_limit)
+    if stats is None:
+        stats = SearchStats()
+
+    # Depth 1 always runs without limits, so there's always a move to return
+    start_nodes = stats.nodes
+    line = [] if pv is not None else None
+    value, best_move = minimax(position.copy(), 1, -math.inf, math.inf, True, table, None, ordering, stats=stats, tablebase=tablebase, pv=line)
+    stats.finished_iteration(1, stats.nodes - start_nodes)
+
+    for depth in range(2, max_depth + 1):
+        # A won or lost game won't change with a deeper search
+        if value in (math.inf, -math.inf):
+            break
+
+        start_nodes = stats.nodes
+        try:
+            if parallel is not None:
+                value, best_move = parallel.search(position, depth, table, limits, ordering, stats, tablebase)
+                if pv is not None:
+                    # The workers search with their own tables, so the rest of the line is only in this table if it was searched here before
+                    line = [best_move]
+                    _extend_from_table(position, line, depth, table)
+            else:
+                iteration_line = [] if pv is not None else None
+                value, best_move = aspiration_search(position, depth, value, table, limits, ordering, stats, tablebase, iteration_line)
+                line = iteration_line
+        except SearchAborted:
+            break
+        stats.finished_iteration(depth, stats.nodes - start_nodes)
+
+    if pv is not None:
+        pv[:] = line
+    return value, best_move
+
+def aspiration_search(position, depth, previous=None, table=None, limits=None, ordering=None, stats=None, tablebase=None, pv=None):
+    # Searches a copy of the position like minimax from the root, but with a window around previous, the score of the search a depth shallower.
+    # The score rarely moves far between depths, and the smaller window cuts off more. A score outside of the window is only a bound
+    # on the real one, so then the window is opened on that side and the position searched again.
+    # If given a list, it's filled with the principal variation.
+    alpha, beta = -math.inf, math.inf
+    if previous is not None and aspiration_window is not None and math.isfinite(previous):
+        alpha, beta = previous - aspiration_window, previous + aspiration_window
+
+    while True:
+        line = [] if pv is not None else None
+        # An aborted search leaves its position in the middle of a move, so every search gets its own copy
+        value, best_move = minimax(position.copy(), depth, alpha, beta, True, table, limits, ordering, stats=stats, tablebase=tablebase, pv=line)
+
+        if value <= alpha and alpha != -math.inf:
+            alpha = -math.inf
+        elif value >= beta and beta != math.inf:
+            beta = math.inf
+        else:
+            break
+        if stats is not None:
+            stats.aspiration_researches += 1
+
+    if pv is not None:
+        pv[:] = line
+        _extend_from_table(position, pv, depth, table)
+    return value, best_move
+
+def _extend_from_table(position, pv, depth, table):
+# Continues a principal variation that was cut short by a node that took its score from the transposition table,
+# with the best moves stored for the positions after it, until it's depth moves long
+    if table is None:
+        return
+
+    position = position.copy()
+    turn = AI_PLAYER
+    for move in pv:
+        position.make_move(move)
+        turn = HUMAN_PLAYER if turn == AI_PLAYER else AI_PLAYER
+
+    while len(pv) < depth:
+        entry = table.probe(table.key(position, turn))
+        # A different position with the same key would have a move that isn't legal here
+        if entry is None or entry[4] is None or entry[4] not in position.get_legal_moves(turn):
+            break
+        pv.append(entry[4])
+        position.make_move(entry[4])
+        turn = HUMAN_PLAYER if turn == AI_PLAYER else AI_PLAYER
+
+def minimax(position, depth, alpha, beta, max_player, table=None, limits=None, ordering=None, ply=0, stats=None, tablebase=None, pv=None):
+    # Position is a BitBoard, which is searched in place by making and unmaking every move. Returns the score and the best move.
+    # If given a transposition table, positions that were already searched deep enough are taken from it instead of searched again.
+    # If given search limits, raises SearchAborted when they run out.
+    # If given a move ordering, the moves of every node are sorted by it. Ply is how many moves the node is from the root.
+    # If given search stats, they're counted in it.
+    # If given a tablebase, the positions in it return their result from it instead of being searched, except for the root which needs a move.
+    # If given a list, it's filled with the principal variation: the best move and the moves both players are expected to answer with after it.
+    # It stops early where the rest was taken from the transposition table or the tablebase, see aspiration_search.
+    # With principal_variation_search, only the first move of every node is searched with the full window. The rest are expected to be worse,
+    # which a zero window proves with less nodes, and are only searched again with the full window if they aren't.
+    if limits is not None:
+        limits.count_node()
+    if stats is not None:
+        stats.nodes += 1
+
+    turn = AI_PLAYER if max_player else HUMAN_PLAYER
+
+    if tablebase is not None and ply > 0:
+        entry = tablebase.probe(position, turn)
+        if entry is not None:
+            if stats is not None:
+                stats.tablebase_hits += 1
+            return tablebase_score(*entry, max_player, ply), None
+    original_alpha, original_beta = alpha, beta
+    hash_move = None
+
+    if table is not None and depth > 0:
+        key = table.key(position, turn)
+        entry = table.probe(key)
+        if stats is not None:
+            stats.table_probes += 1
+        if entry is not None:
+            _, entry_depth, bound, score, hash_move, _ = entry
+            if stats is not None:
+                stats.table_hits += 1
+            if entry_depth >= depth:
+                if bound == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                elif bound == UPPER_BOUND:
+                    beta = min(beta, score)
+                if bound == EXACT or beta <= alpha:
+                    if stats is not None:
+                        stats.table_cutoffs += 1
+                    return score, hash_move
 
-def minimax(position, depth, alpha, beta, max_player):
     # If we've hit the end of the algorithim or the game is over, end the algorithm
-    if depth == 0 or position.winner(AI_PLAYER if max_player else HUMAN_PLAYER):
+    if stats is not None and depth != 0:
+        stats.winner_calls += 1
+    if depth == 0 or position.winner(turn):
+        if stats is not None:
+            stats.leaf_evaluations += 1
         if advanced_evalaute:
-            return position.advanced_evaluate(), position
+            return position.advanced_evaluate(), None
         else:
-            return position.simple_evaluate(), position
+            return position.simple_evaluate(), None
+
+    if stats is not None:
+        start = time.perf_counter()
+    moves = position.get_legal_moves(turn)
+    if stats is not None:
+        stats.generated_moves(start)
+    if ordering is not None:
+        ordering.order(position, moves, hash_move, ply)
+    elif hash_move in moves:
+        # The best move from an earlier search of this position is the most likely to be the best again, so it's searched first
+        moves.remove(hash_move)
+        moves.insert(0, hash_move)
+
+    # The leaves of a node with many moves are evaluated all together, which is faster with NumPy
+    leaf_scores = None
+    if batch_evaluation and depth == 1 and len(moves) >= batch.MIN_BATCH and batch.available():
+        if tablebase is None or (position.white | position.black).bit_count() - max(captures_of(move) for move in moves) > tablebase.pieces:
+            leaf_scores = batch.evaluate_children(position, moves, advanced_evalaute)
 
     # If max player is true, maximize the score, If false, minimize it
     if max_player:
@@ -18,77 +238,106 @@ def minimax(position, depth, alpha, beta, max_player):
         best_move = None
 
         # Evaluate every single move by activating the minimax function recursively, and switching the max_player
-        for move in get_all_boards_after_moves(position, AI_PLAYER):
-            evaluation = minimax(move, depth-1, alpha, beta, False)[0]
+        for index, move in enumerate(moves):
+            line = [] if pv is not None else None
+            if leaf_scores is not None:
+                _count_leaf(limits, stats)
+                evaluation = batch.add_random_digit(leaf_scores[index]) if advanced_evalaute else leaf_scores[index]
+            else:
+                undo = position.make_move(move)
+                if index == 0 or not principal_variation_search or alpha == -math.inf:
+                    evaluation = minimax(position, depth-1, alpha, beta, False, table, limits, ordering, ply+1, stats, tablebase, line)[0]
+                else:
+                    # Proves the move scores at most alpha, or searches it again if it doesn't
+                    evaluation = minimax(position, depth-1, alpha, alpha + ZERO_WINDOW, False, table, limits, ordering, ply+1, stats, tablebase)[0]
+                    if alpha < evaluation < beta:
+                        if stats is not None:
+                            stats.pvs_researches += 1
+                        evaluation = minimax(position, depth-1, alpha, beta, False, table, limits, ordering, ply+1, stats, tablebase, line)[0]
+                position.unmake_move(undo)
 
+            # If the current move is better than the best move so far then set the best move as the current move.
+            # A move that only ties it may have been cut off at that score, and be worse.
+            if best_move is None or evaluation > maxEval:
+                best_move = move
+                if pv is not None:
+                    pv[:] = [move] + line
             maxEval = max(maxEval, evaluation)
             # For alpha beta pruning: Checks whether or not this branch needs to be pruned
             alpha = max(alpha, evaluation)
             if beta <= alpha:
+                if ordering is not None:
+                    ordering.cutoff(move, depth, ply, index)
+                if stats is not None:
+                    stats.cutoff(ply)
                 break
-            # If the current move is the best move then set the best move as the current move
-            if maxEval == evaluation:
-                best_move = move
 
-        return maxEval, best_move
+        result = maxEval
     else:
         minEval = math.inf
         best_move = None
 
         # Evaluate every single move by activating the minimax function recursively, and switching the max_player
-        for move in get_all_boards_after_moves(position, HUMAN_PLAYER):
-            evaluation = minimax(move, depth-1, alpha, beta, True)[0]
+        for index, move in enumerate(moves):
+            line = [] if pv is not None else None
+            if leaf_scores is not None:
+                _count_leaf(limits, stats)
+                evaluation = batch.add_random_digit(leaf_scores[index]) if advanced_evalaute else leaf_scores[index]
+            else:
+                undo = position.make_move(move)
+                if index == 0 or not principal_variation_search or beta == math.inf:
+                    evaluation = minimax(position, depth-1, alpha, beta, True, table, limits, ordering, ply+1, stats, tablebase, line)[0]
+                else:
+                    # Proves the move scores at least beta, or searches it again if it doesn't
+                    evaluation = minimax(position, depth-1, beta - ZERO_WINDOW, beta, True, table, limits, ordering, ply+1, stats, tablebase)[0]
+                    if alpha < evaluation < beta:
+                        if stats is not None:
+                            stats.pvs_researches += 1
+                        evaluation = minimax(position, depth-1, alpha, beta, True, table, limits, ordering, ply+1, stats, tablebase, line)[0]
+                position.unmake_move(undo)
 
+            # If the current move is better than the best move so far then set the best move as the current move.
+            # A move that only ties it may have been cut off at that score, and be worse.
+            if best_move is None or evaluation < minEval:
+                best_move = move
+                if pv is not None:
+                    pv[:] = [move] + line
             minEval = min(minEval, evaluation)
             # For alpha beta pruning: Checks whether or not this branch needs to be pruned
             beta = min(beta, evaluation)
             if beta <= alpha:
+                if ordering is not None:
+                    ordering.cutoff(move, depth, ply, index)
+                if stats is not None:
+                    stats.cutoff(ply)
                 break
-            # If the current move is the best move then set the best move as the current move
-            if minEval == evaluation:
-                best_move = move
-
-        return minEval, best_move
-
-def simulate_move(piece, move, board, skip):
-# Simulates a move
-    board.move(piece, move[0], move[1])
 
-    if skip:
-        board.remove(skip)
-    
-    return board
+        result = minEval
 
-def get_all_boards_after_moves(board, color):
-# Returns all possible move for a color in a board (in board form)
-    moves = [] # List of all the boards after every move
-    
-    if srufim:
-        srufim_moves = board.filter_srufim(color)
-
-        for piece in board.get_all_pieces(color):
-            valid_moves = board.get_valid_moves(piece)
-
-            for move in valid_moves.moves:
-                if not srufim_moves.does_move_exist(move): # If move doesn't exist after srufim filter, skip it
-                    continue
-
-                # Copies the board and simulates the move on it
-                temp_board = deepcopy(board)
-                temp_piece = temp_board.get_piece(piece.row, piece.col)
+    if table is not None:
+        # A score outside of the window is only a bound on the real score
+        if result <= original_alpha:
+            bound = UPPER_BOUND
+        elif result >= original_beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        table.store(key, depth, bound, result, best_move)
 
-                new_board = simulate_move(temp_piece, move.target, temp_board, move.skipped)
-                moves.append(new_board)
-    else:
-        for piece in board.get_all_pieces(color):
-            valid_moves = board.get_valid_moves(piece)
+    return result, best_move
 
-            for move in valid_moves.moves:
-                # Copies the board and simulates the move on it
-                temp_board = deepcopy(board)
-                temp_piece = temp_board.get_piece(piece.row, piece.col)
+def _count_leaf(limits, stats):
+# Counts a leaf that was evaluated with the rest of its node's leaves, like minimax would count it
+    if limits is not None:
+        limits.count_node()
+    if stats is not None:
+        stats.nodes += 1
+        stats.leaf_evaluations += 1
 
-                new_board = simulate_move(temp_piece, move.target, temp_board, move.skipped)
-                moves.append(new_board)
+def tablebase_score(result, distance, max_player, ply):
+# The score of a tablebase result for the color to move, so that faster wins and slower losses score better
+    if result == DRAW:
+        return 0
 
-    return moves
\ No newline at end of file
+    score = TABLEBASE_WIN - ply - distance
+    return score if (result == WIN) == max_player else -score
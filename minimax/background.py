@@ -0,0 +1,27 @@
+import threading
+from .algorithm import iterative_deepening, SearchLimits
+from .stats import SearchStats
+
+class BackgroundSearch:
+    # Runs iterative deepening in a background thread, so the game keeps drawing and handling events while the AI thinks.
+    # The game polls done() every frame, and can stop the search or change its limits while it runs.
+    def __init__(self, position, max_depth, time_limit, node_limit, table, ordering, parallel=None, tablebase=None):
+        self.position = position
+        self.limits = SearchLimits(time_limit, node_limit)
+        self.stats = SearchStats()
+        self.result = None # The score and best move, once done
+        self.pv = [] # The principal variation, once done
+
+        self.thread = threading.Thread(target=self._run, args=(max_depth, table, ordering, parallel, tablebase), daemon=True)
+        self.thread.start()
+
+    def _run(self, max_depth, table, ordering, parallel, tablebase):
+        self.result = iterative_deepening(self.position, max_depth, table=table, ordering=ordering, limits=self.limits, parallel=parallel, stats=self.stats, tablebase=tablebase, pv=self.pv)
+
+    def done(self):
+        return not self.thread.is_alive()
+
+    def cancel(self):
+    # Stops the search and waits for the thread to end
+        self.limits.stop()
+        self.thread.join()
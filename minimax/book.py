@@ -0,0 +1,197 @@
+import os
+import mmap
+import math
+import time
+import random
+import struct
+import argparse
+from checkers.bitboard import BitBoard
+from checkers.constants import WHITE, BLACK, AI_PLAYER, DEFAULT_FEN
+from checkers.zobrist import turn_key
+from checkers import settings
+from .algorithm import minimax
+from .transposition import TranspositionTable
+from .ordering import MoveOrdering
+from .stats import SearchStats
+from .tablebase import rules
+
+# The opening book: the AI's moves for the first positions of the game, found by deep searches ahead of time so the game doesn't search them again.
+# The file has a record for every book move, sorted by the hash of its position, and is memory mapped and binary searched like the tablebase.
+# Build with: python -m minimax.book [--plies N] [--depth N] [--margin N]
+
+MAGIC = b'CKOB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBI') # Magic, version, rules, AI color (0 for white), unused, number of records
+RECORD = struct.Struct('<QBBLH') # Position key, origin, target, captured, weight
+
+def book_path():
+    return os.path.join('books', f"opening_rules{rules()}.bin")
+
+def position_key(position, turn):
+# The same as the transposition table's key
+    return position.hash ^ turn_key(turn)
+
+class OpeningBook:
+    # A generated book, opened for lookups
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, book_rules, ai_color, _, self.size = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} isn't an opening book of this version")
+        if book_rules != rules() or ai_color != (AI_PLAYER == BLACK):
+            self.close()
+            raise ValueError(f"{path} was generated with different rules or for the other color")
+
+        self.path = path
+
+    @classmethod
+    def open(cls):
+    # Opens the book for the current rules, or returns None if it wasn't generated
+        path = book_path()
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def _key_at(self, index):
+        return RECORD.unpack_from(self.map, HEADER.size + index * RECORD.size)[0]
+
+    def moves(self, position, turn):
+    # Returns the book's (move, weight) for a position, or an empty list if it isn't in the book
+        key = position_key(position, turn)
+
+        # Binary search for the first record of the key
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        moves = []
+        for index in range(low, self.size):
+            record_key, origin, target, captured, weight = RECORD.unpack_from(self.map, HEADER.size + index * RECORD.size)
+            if record_key != key:
+                break
+            moves.append(((origin, target, captured), weight))
+
+        # A different position with the same hash would have moves that aren't legal here
+        legal_moves = position.get_legal_moves(turn)
+        return [(move, weight) for move, weight in moves if move in legal_moves]
+
+    def choose(self, position, turn, weighted_random=True):
+    # Returns a book move for the position, or None if it isn't in the book.
+    # The move is picked at random by the weights, or the one with the highest weight.
+        moves = self.moves(position, turn)
+        if not moves:
+            return None
+        if weighted_random:
+            return random.choices([move for move, _ in moves], [weight for _, weight in moves])[0]
+        return max(moves, key=lambda entry: entry[1])[0]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __repr__(self):
+        return f"OpeningBook({self.path!r}, {self.size} moves)"
+
+class BookMove:
+    # Stands in for a BackgroundSearch when the AI's move comes from the book, so the game handles both the same way
+    def __init__(self, position, move):
+        self.position = position
+        self.result = (None, move)
+        self.pv = [move]
+        self.stats = SearchStats()
+
+    def done(self):
+        return True
+
+    def cancel(self):
+        pass
+
+def _best_moves(position, depth, margin, max_moves, table, ordering):
+# Searches every move of the AI and returns (move, weight) for the best ones: the moves that score at most margin less than the best,
+# weighted higher the closer they are to it
+    table.new_search()
+    ordering.new_search()
+
+    scores = []
+    for move in position.get_legal_moves(AI_PLAYER):
+        score = minimax(position.after_move(move), depth - 1, -math.inf, math.inf, False, table, None, ordering, 1)[0]
+        scores.append((score, move))
+
+    scores.sort(key=lambda entry: entry[0], reverse=True)
+    best = scores[0][0]
+
+    moves = []
+    for score, move in scores[:max_moves]:
+        difference = 0 if score == best else best - score
+        if difference > margin:
+            break
+        moves.append((move, min(int(margin - difference) + 1, 0xFFFF)))
+
+    return moves
+
+def build(plies, depth, margin, max_moves, log=print):
+# Goes over every position up to plies moves from the start, where the human plays every move and the AI only its book moves,
+# and returns the book's records as (key, move, weight)
+    random.seed(2021) # The evaluation's random digit, so the same settings build the same book
+    table = TranspositionTable(settings.transposition_table_size)
+    ordering = MoveOrdering()
+    start = time.perf_counter()
+
+    position, turn = BitBoard.from_fen(DEFAULT_FEN)
+    frontier = {position_key(position, turn): (position, turn)}
+    records = []
+
+    for ply in range(plies):
+        next_frontier = {}
+        for key, (position, turn) in frontier.items():
+            if position.winner(turn) is not None:
+                continue
+
+            if turn == AI_PLAYER:
+                moves = _best_moves(position, depth, margin, max_moves, table, ordering)
+                records.extend((key, move, weight) for move, weight in moves)
+                moves = [move for move, _ in moves]
+            else:
+                moves = position.get_legal_moves(turn)
+
+            next_turn = BLACK if turn == WHITE else WHITE
+            for move in moves:
+                child = position.after_move(move)
+                next_frontier[position_key(child, next_turn)] = (child, next_turn)
+
+        log(f"Ply {ply + 1}: {len(frontier)} positions, {len(records)} book moves so far ({time.perf_counter() - start:.1f}s)")
+        frontier = next_frontier
+
+    return records
+
+def save(records, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    records.sort(key=lambda record: record[0])
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, rules(), AI_PLAYER == BLACK, 0, len(records)))
+        for key, (origin, target, captured), weight in records:
+            file.write(RECORD.pack(key, origin, target, captured, weight))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates the opening book for the rules and AI color in the settings.")
+    parser.add_argument('--plies', type=int, default=4, help="How many moves from the start the book covers, of both colors")
+    parser.add_argument('--depth', type=int, default=9, help="How deep every book position is searched")
+    parser.add_argument('--margin', type=float, default=10 if settings.advanced_evalaute else 0, help="How much worse than the best move a book move can score")
+    parser.add_argument('--moves', type=int, default=3, help="The most book moves for a position")
+    args = parser.parse_args()
+
+    path = book_path()
+    records = build(args.plies, args.depth, args.margin, args.moves)
+    save(records, path)
+    print(f"Saved {len(records)} moves to {path}")
+
+if __name__ == '__main__':
+    main()
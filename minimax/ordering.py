@@ -0,0 +1,78 @@
+from checkers.bitboard import SQUARES
+
+# Every kind of move is sorted in its own range of scores, so a better kind always comes first
+HASH_MOVE_SCORE = 1 << 50
+CAPTURE_SCORE = 1 << 40 # Plus the number of captures
+PROMOTION_SCORE = 1 << 35
+KILLER_SCORE = 1 << 30 # The history scores are kept below this
+
+KILLERS_PER_PLY = 2
+
+class MoveOrdering:
+    # Sorts the moves of every node so the ones most likely to be the best are searched first, which makes alpha beta prune earlier.
+    # The order is: the best move from the transposition table, captures (more captures first), promotions,
+    # killer moves (quiet moves that pruned in another node at the same ply), and then by the history of every quiet move.
+    def __init__(self):
+        self.killers = []
+        self.history = [[0] * SQUARES for _ in range(SQUARES)] # History score by origin and target square
+
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+    # Killers only make sense inside one search, the history is kept but made less important
+        self.killers = []
+        for scores in self.history:
+            for target in range(SQUARES):
+                scores[target] //= 2
+
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def order(self, position, moves, hash_move, ply):
+    # Sorts the moves in place
+        if len(moves) < 2:
+            return
+
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+
+        def score(move):
+            if move == hash_move:
+                return HASH_MOVE_SCORE
+            captures = move[2].bit_count()
+            if captures:
+                return CAPTURE_SCORE + captures
+            if position.is_promotion(move):
+                return PROMOTION_SCORE
+            if move in killers:
+                return KILLER_SCORE
+            return history[move[0]][move[1]]
+
+        moves.sort(key=score, reverse=True)
+
+    def cutoff(self, move, depth, ply, index):
+    # Called when a move prunes the rest of the moves in its node. Index is the move's place in the order it was searched.
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+
+        # Captures are already sorted first, killers and history are only for quiet moves
+        if move[2]:
+            return
+
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLERS_PER_PLY:]
+
+        scores = self.history[move[0]]
+        scores[move[1]] = min(scores[move[1]] + depth * depth, KILLER_SCORE - 1)
+
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0
+
+    def __repr__(self):
+        return f"Move ordering: {self.cutoffs} cutoffs, {self.first_move_cutoff_rate() * 100:.1f}% on the first move"
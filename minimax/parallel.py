@@ -0,0 +1,140 @@
+import math
+import multiprocessing
+from checkers.bitboard import BitBoard
+from checkers.constants import AI_PLAYER
+from checkers.settings import transposition_table_size
+from .algorithm import minimax, SearchLimits, SearchAborted
+from .transposition import TranspositionTable, EXACT
+from .ordering import MoveOrdering
+from .stats import SearchStats
+from .tablebase import Tablebase
+
+# Set in every worker process by _init_worker
+_alpha = None # The best score found so far for the root, shared by all the processes
+_current_search = None # The id of the search the workers should be working on, shared by all the processes
+_table = None
+_ordering = None
+_tablebase = None
+
+def _init_worker(alpha, current_search):
+    global _alpha, _current_search, _table, _ordering, _tablebase
+
+    _alpha = alpha
+    _current_search = current_search
+    # Every worker keeps its own table and ordering between tasks
+    _table = TranspositionTable(transposition_table_size)
+    _ordering = MoveOrdering()
+    _tablebase = Tablebase.open()
+
+class _WorkerLimits(SearchLimits):
+    # Also stops when the main process moved on from the search the task belongs to
+    def __init__(self, time_limit, node_limit, search_id):
+        super().__init__(time_limit, node_limit)
+        self.search_id = search_id
+
+    def count_node(self):
+        if _current_search.value != self.search_id:
+            raise SearchAborted
+        super().count_node()
+
+def _search_root_move(masks, move, depth, time_limit, node_limit, search_id):
+# Runs in a worker: searches the board after one of the root's moves, with the best score any process found so far as alpha.
+# Returns the score, whether it's exact (a lower score is only an upper bound of the real one) and the stats of the search.
+    position = BitBoard(*masks)
+    position.make_move(move)
+    limits = _WorkerLimits(time_limit, node_limit, search_id)
+    stats = SearchStats()
+    alpha = _alpha.value
+
+    try:
+        evaluation = minimax(position, depth - 1, alpha, math.inf, False, _table, limits, _ordering, 1, stats, _tablebase)[0]
+    except SearchAborted:
+        return None, False, stats
+
+    with _alpha.get_lock():
+        if evaluation > _alpha.value:
+            _alpha.value = evaluation
+
+    return evaluation, evaluation > alpha, stats
+
+class ParallelSearch:
+    # Splits the search of the root's moves between a pool of worker processes, since threads can't search at the same time in python.
+    # The first move is searched in this process to get a score to beat, then the rest are searched by the workers.
+    # Every time a worker finds a better score it's shared with the others as their alpha, so they can prune as much as a single search would.
+    def __init__(self, workers):
+        # Spawned rather than forked, since the game's process has pygame and the search threads running.
+        # The workers import the engine and the script that started them again, so main.py only imports pygame and the window in main().
+        context = multiprocessing.get_context('spawn')
+
+        self.workers = workers
+        self.alpha = context.Value('d', -math.inf)
+        self.current_search = context.RawValue('i', 0)
+        self.pool = context.Pool(workers, initializer=_init_worker, initargs=(self.alpha, self.current_search))
+
+    def search(self, position, depth, table=None, limits=None, ordering=None, stats=None, tablebase=None):
+    # Returns the score and best move for the AI, the same as minimax from the root. The workers open the tablebase themselves, if it was generated.
+        moves = position.get_legal_moves(AI_PLAYER)
+        if depth < 2 or len(moves) < 2:
+            return minimax(position.copy(), depth, -math.inf, math.inf, True, table, limits, ordering, stats=stats, tablebase=tablebase)
+
+        hash_move = None
+        if table is not None:
+            entry = table.probe(table.key(position, AI_PLAYER))
+            if entry is not None:
+                hash_move = entry[4]
+        if ordering is not None:
+            ordering.order(position, moves, hash_move, 0)
+        elif hash_move in moves:
+            moves.remove(hash_move)
+            moves.insert(0, hash_move)
+
+        # The first move is the most likely to be the best, so it's searched with the full window before the rest
+        first = position.copy()
+        first.make_move(moves[0])
+        best_value = minimax(first, depth - 1, -math.inf, math.inf, False, table, limits, ordering, 1, stats, tablebase)[0]
+        best_move = moves[0]
+        best_exact = True
+
+        self.current_search.value += 1
+        search_id = self.current_search.value
+        self.alpha.value = best_value
+
+        time_limit = limits.time_left() if limits is not None else None
+        node_limit = limits.nodes_left() // self.workers if limits is not None and limits.node_limit is not None else None
+        masks = (position.white, position.black, position.kings, position.hash)
+        tasks = [(move, self.pool.apply_async(_search_root_move, (masks, move, depth, time_limit, node_limit, search_id))) for move in moves[1:]]
+
+        try:
+            for move, task in tasks:
+                # Waits in short steps so the search can still be stopped
+                while not task.ready():
+                    task.wait(0.01)
+                    if limits is not None:
+                        limits.check()
+
+                evaluation, exact, task_stats = task.get()
+                if limits is not None:
+                    limits.nodes += task_stats.nodes
+                if stats is not None:
+                    stats.merge(task_stats)
+                if evaluation is None:
+                    raise SearchAborted
+
+                # A score that's only a bound can tie with the best one, but can't replace it
+                if evaluation > best_value or (evaluation == best_value and exact and not best_exact):
+                    best_value, best_move, best_exact = evaluation, move, exact
+        except SearchAborted:
+            # Makes the workers drop the tasks of this search
+            self.current_search.value += 1
+            raise
+
+        if table is not None:
+            table.store(table.key(position, AI_PLAYER), depth, EXACT, best_value, best_move)
+
+        return best_value, best_move
+
+    def close(self):
+    # Stops the workers once their current task is dropped
+        self.current_search.value += 1
+        self.pool.close()
+        self.pool.join()
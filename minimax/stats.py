@@ -0,0 +1,86 @@
+import time
+
+class SearchStats:
+    # Counts what the search spends its time on. Filled by minimax when given one, and cheap enough to always be on.
+    def __init__(self):
+        self.nodes = 0
+        self.leaf_evaluations = 0
+        self.winner_calls = 0
+        self.move_generations = 0
+        self.move_generation_time = 0 # In seconds
+        self.table_probes = 0
+        self.table_hits = 0
+        self.table_cutoffs = 0 # Nodes that returned the transposition table's score without searching
+        self.tablebase_hits = 0
+        self.pvs_researches = 0 # Moves that weren't proven worse with a zero window, and were searched again
+        self.aspiration_researches = 0 # Searches from the root that scored outside of the aspiration window, and were searched again
+        self.cutoffs = [] # Beta cutoffs by ply
+        self.iterations = [] # (depth, nodes) of every finished iterative deepening search
+
+    def generated_moves(self, start):
+    # Called after generating the moves of a node, with time.perf_counter() from before generating them
+        self.move_generations += 1
+        self.move_generation_time += time.perf_counter() - start
+
+    def cutoff(self, ply):
+        while len(self.cutoffs) <= ply:
+            self.cutoffs.append(0)
+        self.cutoffs[ply] += 1
+
+    def finished_iteration(self, depth, nodes):
+        self.iterations.append((depth, nodes))
+
+    def merge(self, other):
+    # Adds the counts of a search done somewhere else, like in a worker process
+        self.nodes += other.nodes
+        self.leaf_evaluations += other.leaf_evaluations
+        self.winner_calls += other.winner_calls
+        self.move_generations += other.move_generations
+        self.move_generation_time += other.move_generation_time
+        self.table_probes += other.table_probes
+        self.table_hits += other.table_hits
+        self.table_cutoffs += other.table_cutoffs
+        self.tablebase_hits += other.tablebase_hits
+        self.pvs_researches += other.pvs_researches
+        self.aspiration_researches += other.aspiration_researches
+        self.cutoffs += [0] * (len(other.cutoffs) - len(self.cutoffs))
+        for ply, cutoffs in enumerate(other.cutoffs):
+            self.cutoffs[ply] += cutoffs
+
+    def effective_branching_factor(self):
+    # How many times more nodes every extra ply of depth costs: the nodes of the last two iterations divided,
+    # or the depth's root of the nodes if there was only one
+        if len(self.iterations) >= 2 and self.iterations[-2][1]:
+            return self.iterations[-1][1] / self.iterations[-2][1]
+        if self.iterations:
+            depth, nodes = self.iterations[-1]
+            return nodes ** (1 / depth)
+        return 0
+
+    def total_cutoffs(self):
+        return sum(self.cutoffs)
+
+    def to_dict(self):
+        return {
+            'nodes': self.nodes,
+            'leaf_evaluations': self.leaf_evaluations,
+            'winner_calls': self.winner_calls,
+            'move_generations': self.move_generations,
+            'move_generation_time': self.move_generation_time,
+            'table_probes': self.table_probes,
+            'table_hits': self.table_hits,
+            'table_cutoffs': self.table_cutoffs,
+            'tablebase_hits': self.tablebase_hits,
+            'pvs_researches': self.pvs_researches,
+            'aspiration_researches': self.aspiration_researches,
+            'cutoffs': self.cutoffs,
+            'iterations': self.iterations,
+            'effective_branching_factor': self.effective_branching_factor(),
+        }
+
+    def __repr__(self):
+        return (f"Search: {self.nodes} nodes, {self.leaf_evaluations} evaluations, {self.winner_calls} winner calls, "
+                f"{self.move_generations} move generations in {self.move_generation_time:.3f}s, "
+                f"{self.table_hits}/{self.table_probes} table hits ({self.table_cutoffs} cutoffs), {self.tablebase_hits} tablebase hits, "
+                f"{self.pvs_researches} zero window and {self.aspiration_researches} aspiration re-searches, "
+                f"{self.total_cutoffs()} beta cutoffs {self.cutoffs}, effective branching factor {self.effective_branching_factor():.2f}")
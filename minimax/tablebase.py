@@ -0,0 +1,229 @@
+import os
+import mmap
+import math
+import time
+import struct
+import argparse
+import itertools
+from array import array
+from checkers.bitboard import BitBoard, SQUARES, WHITE_KINGS_ROW, BLACK_KINGS_ROW
+from checkers.constants import WHITE, BLACK
+from checkers.utility import squares_of
+from checkers.zobrist import WHITE_PIECE, WHITE_KING, BLACK_PIECE, BLACK_KING
+from checkers import settings
+
+# Endgame tablebases: the result of every position with a few pieces left, with perfect play, found by retrograde analysis.
+# The table is a file with one byte for every position, which is memory mapped so opening it costs nothing and a probe reads one byte.
+# Build with: python -m minimax.tablebase [--pieces N]
+
+WIN, LOSS, DRAW = 1, -1, 0 # For the color to move
+
+MIN_PIECES = 2 # One of each color
+MAGIC = b'CKTB'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBB') # Magic, version, pieces, rules, unused
+MAX_DISTANCE = 254
+
+# C(n, k) for the combinatorial index of the occupied squares
+BINOMIALS = tuple(tuple(math.comb(n, k) for k in range(SQUARES + 1)) for n in range(SQUARES + 1))
+
+def _build_offsets(pieces):
+# Where the positions of every number of pieces start. Each has C(32, n) sets of squares, 4 kinds of pieces on each square and 2 colors to move.
+    offsets = [0] * (MIN_PIECES + 1)
+    for count in range(MIN_PIECES, pieces + 1):
+        offsets.append(offsets[-1] + BINOMIALS[SQUARES][count] * 4 ** count * 2)
+    return offsets
+
+def rules():
+# The rules that change the results, as bits
+    return settings.free_king_movement | settings.srufim << 1 | settings.backwards_eating_in_doubles << 2
+
+def tablebase_path(pieces):
+    return os.path.join('tablebases', f"endgame{pieces}_rules{rules()}.bin")
+
+def position_index(white, black, kings, turn, offsets):
+# The position's place in the table: the occupied squares are numbered by the combinatorial number system,
+# then the kind of piece on each of them is a base 4 digit, then the color to move.
+    occupied = white | black
+    count = occupied.bit_count()
+    rank = kinds = 0
+
+    for place, square in enumerate(squares_of(occupied), 1):
+        rank += BINOMIALS[square][place]
+        bit = 1 << square
+        if white & bit:
+            kind = WHITE_KING if kings & bit else WHITE_PIECE
+        else:
+            kind = BLACK_KING if kings & bit else BLACK_PIECE
+        kinds = kinds << 2 | kind
+
+    return offsets[count] + ((rank << 2 * count | kinds) << 1 | (turn == BLACK))
+
+def _encode(distance):
+# 0 is a draw, and otherwise the distance + 1. Losses are always an even distance from the end and wins an odd one, as the loser moves last.
+    return distance + 1
+
+def _decode(value):
+    if value == 0:
+        return DRAW, 0
+    return (LOSS if value % 2 else WIN), value - 1
+
+class Tablebase:
+    # A generated table, opened for probing
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.pieces, table_rules, _ = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} isn't a tablebase of this version")
+        if table_rules != rules():
+            self.close()
+            raise ValueError(f"{path} was generated with different rules")
+
+        self.path = path
+        self.offsets = _build_offsets(self.pieces)
+
+    @classmethod
+    def open(cls, pieces=None):
+    # Opens the table for the current rules, or returns None if it wasn't generated
+        path = tablebase_path(pieces if pieces is not None else settings.tablebase_pieces)
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def probe(self, position, turn):
+    # Returns the result for the color to move and how many moves until the game ends, or None if the position has too many pieces.
+    # A color without pieces (which is also every position with less than MIN_PIECES) isn't in the table, the game is already over.
+        if not position.white or not position.black or (position.white | position.black).bit_count() > self.pieces:
+            return None
+        return _decode(self.map[HEADER.size + position_index(position.white, position.black, position.kings, turn, self.offsets)])
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __repr__(self):
+        return f"Tablebase({self.path!r}, pieces={self.pieces})"
+
+def _positions(pieces):
+# Yields every position with 2 to pieces pieces that can come up in a game, as (white, black, kings)
+    for count in range(MIN_PIECES, pieces + 1):
+        for squares in itertools.combinations(range(SQUARES), count):
+            for kinds in itertools.product((WHITE_PIECE, WHITE_KING, BLACK_PIECE, BLACK_KING), repeat=count):
+                white = black = kings = 0
+                for square, kind in zip(squares, kinds):
+                    bit = 1 << square
+                    if kind in (WHITE_PIECE, WHITE_KING):
+                        white |= bit
+                    else:
+                        black |= bit
+                    if kind in (WHITE_KING, BLACK_KING):
+                        kings |= bit
+
+                # Both colors need pieces, and pieces on the kings row would have been made kings
+                if not white or not black or (white & ~kings & WHITE_KINGS_ROW) or (black & ~kings & BLACK_KINGS_ROW):
+                    continue
+                yield white, black, kings
+
+def generate(pieces, log=print):
+# Solves every position with up to pieces pieces, for the current rules, and returns the table's values.
+# Every position's moves are generated once to link it to the positions it leads to, then the results are spread backwards
+# from the positions where the color to move can't move: a position is won if a move leads to a lost one,
+# and lost once every move leads to a won one. Whatever is left is a draw.
+    offsets = _build_offsets(pieces)
+    size = offsets[-1]
+    values = bytearray(size)
+    moves_left = array('H', [0]) * size # Moves that weren't found to lead to a win for the other color yet
+    successors, predecessors = array('l'), array('l')
+    layers = [[], []] # Positions solved at every distance
+    start = time.perf_counter()
+
+    for white, black, kings in _positions(pieces):
+        for turn, enemy_turn in ((WHITE, BLACK), (BLACK, WHITE)):
+            index = position_index(white, black, kings, turn, offsets)
+            position = BitBoard(white, black, kings, 0)
+            moves = position.get_legal_moves(turn)
+
+            if not moves:
+                values[index] = _encode(0)
+                layers[0].append(index)
+                continue
+
+            moves_left[index] = len(moves)
+            for move in moves:
+                undo = position.make_move(move)
+                if not position.get_pieces(enemy_turn):
+                    # Captured the last enemy piece
+                    if not values[index]:
+                        values[index] = _encode(1)
+                        layers[1].append(index)
+                else:
+                    successors.append(position_index(position.white, position.black, position.kings, enemy_turn, offsets))
+                    predecessors.append(index)
+                position.unmake_move(undo)
+
+    log(f"Linked {len(successors)} moves in {time.perf_counter() - start:.1f}s")
+
+    # Sorts the predecessors by successor, so the positions leading to every position are in one slice
+    first = array('l', [0]) * (size + 1)
+    for successor in successors:
+        first[successor + 1] += 1
+    for index in range(size):
+        first[index + 1] += first[index]
+    sorted_predecessors = array('l', [0]) * len(predecessors)
+    filled = array('l', first)
+    for successor, predecessor in zip(successors, predecessors):
+        sorted_predecessors[filled[successor]] = predecessor
+        filled[successor] += 1
+    del successors, predecessors, filled
+
+    distance = 0
+    while True:
+        if distance >= MAX_DISTANCE:
+            raise ValueError(f"A position is more than {MAX_DISTANCE} moves from the end")
+        if len(layers) == distance + 1:
+            layers.append([])
+        next_layer = layers[distance + 1]
+
+        for index in layers[distance]:
+            won = values[index] % 2 == 0
+            for predecessor in sorted_predecessors[first[index]:first[index + 1]]:
+                if values[predecessor]:
+                    continue
+                if not won:
+                    # A move to a lost position wins
+                    values[predecessor] = _encode(distance + 1)
+                    next_layer.append(predecessor)
+                else:
+                    moves_left[predecessor] -= 1
+                    if moves_left[predecessor] == 0:
+                        # Every move leads to a won position, and the longest one was the last to be found
+                        values[predecessor] = _encode(distance + 1)
+                        next_layer.append(predecessor)
+
+        distance += 1
+        if not next_layer:
+            break
+
+    log(f"Solved in {time.perf_counter() - start:.1f}s, the longest game is {distance - 1} moves")
+    return values
+
+def save(pieces, values, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, pieces, rules(), 0))
+        file.write(values)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates the endgame tablebase for the rules in the settings.")
+    parser.add_argument('--pieces', type=int, default=settings.tablebase_pieces, help="The most pieces of a position in the table")
+    args = parser.parse_args()
+
+    path = tablebase_path(args.pieces)
+    save(args.pieces, generate(args.pieces), path)
+    print(f"Saved {path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+from checkers.zobrist import turn_key
+
+# Bound types of a stored score
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+class TranspositionTable:
+    # Remembers the results of searched positions, so a position reached again by a different order of moves isn't searched from scratch.
+    # The table has a fixed amount of slots, and a position's slot is picked by its zobrist hash.
+    # When two positions want the same slot, the one searched deeper is kept, unless it's left over from an older search.
+    def __init__(self, size):
+        self.size = size
+        self.slots = [None] * size # Entries of (key, depth, bound, score, best move, generation)
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def new_search(self):
+    # Called before every search, so the entries from older searches are replaced first
+        self.generation += 1
+
+    def key(self, position, turn):
+        return position.hash ^ turn_key(turn)
+
+    def probe(self, key):
+    # Returns the entry for the key, or None if the position isn't in the table
+        entry = self.slots[key % self.size]
+
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, bound, score, best_move):
+        index = key % self.size
+        entry = self.slots[index]
+
+        if entry is None or entry[0] == key or entry[5] != self.generation or depth >= entry[1]:
+            self.slots[index] = (key, depth, bound, score, best_move, self.generation)
+            self.stores += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+        self.hits = self.misses = self.stores = 0
+
+    def __repr__(self):
+        probes = self.hits + self.misses
+        hit_rate = self.hits / probes * 100 if probes else 0
+        return f"Transposition table: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate), {self.stores} stores"
@@ -0,0 +1,153 @@
+import sys
+import json
+import time
+import argparse
+import itertools
+import multiprocessing
+
+# Counts every sequence of moves to a depth from a position (perft), to check the move generators and measure their speed.
+# The last depth's moves are counted without being played, like in most perft tools.
+# The rules are read by the engine when it's imported, so every combination of them is run in its own process.
+# Usage: python perft.py [--generator board|bitboard] [--variant NAME] [--fen FEN --depth N] [--update]
+
+RULES = ('free_king_movement', 'srufim', 'backwards_eating_in_doubles')
+GENERATORS = ('board', 'bitboard')
+REFERENCE_FILE = 'perft.json' # The right counts for every generator, variant and position
+
+# Position name: (FEN, depth)
+POSITIONS = {
+    'start': ("W:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12", 6),
+    'middle': ("B:W12,15,21,23,24,25,26,27,28,29,31,32:B1,2,3,4,5,6,7,8,11,13", 5),
+    'kings': ("W:WK5,18,22,27:B10,14,K24,26", 4),
+    'endgame': ("B:WK2,5,12,21,22,24,27,28,31,32:B1,3,4,8,16", 4),
+}
+
+def variant_name(variant):
+# For example: "free_king_movement+srufim", or "none" with all the rules off
+    return '+'.join(rule for rule, on in zip(RULES, variant) if on) or 'none'
+
+VARIANTS = {variant_name(variant): variant for variant in itertools.product((False, True), repeat=len(RULES))}
+
+def _set_rules(variant):
+# Runs in the variant's process, before the engine is imported
+    from checkers import settings
+    for rule, on in zip(RULES, variant):
+        setattr(settings, rule, on)
+
+def perft_board(board, turn, depth):
+    from checkers.constants import WHITE, BLACK
+
+    legal_moves = board.get_legal_moves(turn)
+    if depth == 1:
+        return sum(len(moves.moves) for moves in legal_moves.values())
+
+    nodes = 0
+    next_turn = BLACK if turn == WHITE else WHITE
+    # The pieces are moved while going over them, so the dict is copied first
+    for piece, moves in list(legal_moves.items()):
+        for move in moves.moves:
+            undo = board.make_move(piece, move)
+            nodes += perft_board(board, next_turn, depth - 1)
+            board.unmake_move(undo)
+
+    return nodes
+
+def perft_bitboard(position, turn, depth):
+    from checkers.constants import WHITE, BLACK
+
+    moves = position.get_legal_moves(turn)
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    next_turn = BLACK if turn == WHITE else WHITE
+    for move in moves:
+        undo = position.make_move(move)
+        nodes += perft_bitboard(position, next_turn, depth - 1)
+        position.unmake_move(undo)
+
+    return nodes
+
+def _run(generator, fen, depth):
+# Runs in the variant's process. Returns the counts for every depth from 1, and how many seconds each took.
+    if generator == 'board':
+        from checkers.board import Board as Position
+        perft = perft_board
+    else:
+        from checkers.bitboard import BitBoard as Position
+        perft = perft_bitboard
+
+    counts, times = [], []
+    for current_depth in range(1, depth + 1):
+        position, turn = Position.from_fen(fen)
+        start = time.perf_counter()
+        counts.append(perft(position, turn, current_depth))
+        times.append(time.perf_counter() - start)
+
+    return counts, times
+
+def run_variant(variant, jobs):
+# Runs (generator, fen, depth) jobs with the variant's rules, in a new process
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1, initializer=_set_rules, initargs=(variant,)) as pool:
+        return [pool.apply(_run, job) for job in jobs]
+
+def load_reference():
+    try:
+        with open(REFERENCE_FILE) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Counts the leaf nodes to a depth with every rule variant, and checks them against the stored counts.")
+    parser.add_argument('--generator', choices=GENERATORS, action='append', help="Default: all")
+    parser.add_argument('--variant', choices=sorted(VARIANTS), action='append', help="Default: all")
+    parser.add_argument('--fen', help="Count from this position instead of the stored ones. Not checked")
+    parser.add_argument('--depth', type=int, help="Overrides the depth of the positions. Deeper than stored isn't checked")
+    parser.add_argument('--update', action='store_true', help="Stores this run's counts as the right ones")
+    args = parser.parse_args()
+
+    generators = args.generator or GENERATORS
+    variants = args.variant or sorted(VARIANTS)
+    if args.fen is not None:
+        positions = {'fen': (args.fen, args.depth or 4)}
+    else:
+        positions = {name: (fen, args.depth or depth) for name, (fen, depth) in POSITIONS.items()}
+
+    reference = load_reference()
+    failed = False
+
+    for name in variants:
+        variant = VARIANTS[name]
+        jobs = [(generator, fen, depth) for generator in generators for fen, depth in positions.values()]
+        results = iter(run_variant(variant, jobs))
+        print(name)
+
+        for generator in generators:
+            for position_name in positions:
+                counts, times = next(results)
+                nodes_per_second = counts[-1] / times[-1] if times[-1] else 0
+                expected = reference.get(generator, {}).get(name, {}).get(position_name) if args.fen is None else None
+
+                if expected is None:
+                    status = ''
+                elif counts[:len(expected)] == expected[:len(counts)]:
+                    status = 'ok'
+                else:
+                    status = f'MISMATCH, expected {expected}'
+                    failed = True
+
+                print(f"  {generator:8} {position_name:8} depth {len(counts)}: {counts[-1]:>9} nodes in {times[-1]:6.2f}s ({nodes_per_second:,.0f} nodes/s) {status}")
+
+                if args.update and args.fen is None:
+                    reference.setdefault(generator, {}).setdefault(name, {})[position_name] = counts
+
+    if args.update and args.fen is None:
+        with open(REFERENCE_FILE, 'w') as file:
+            json.dump(reference, file, indent=4, sort_keys=True)
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
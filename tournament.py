@@ -0,0 +1,294 @@
+import os
+import ast
+import math
+import queue
+import random
+import argparse
+import multiprocessing
+
+# Plays engines with different settings against each other without the window, to compare them, and saves the games.
+# The settings are read by the engine when it's imported, so every engine searches in its own pool of processes with its settings.
+# Every opening is played twice, with the engines switching colors. The search always plays AI_PLAYER, so on the other color it searches the mirrored board.
+# Usage: python tournament.py --engine NAME[:SETTING=VALUE,...] --engine NAME[:SETTING=VALUE,...] [--games N] [--rules SETTING=VALUE,...]
+
+ENGINE_SETTINGS = ('ai_depth', 'ai_time_limit', 'ai_node_limit', 'advanced_evalaute', 'principal_variation_search', 'aspiration_window', 'batch_evaluation', 'transposition_table_size', 'tablebase_pieces')
+RULES = ('free_king_movement', 'srufim', 'backwards_eating_in_doubles')
+OUTPUT_FILE = os.path.join('games', 'tournament.pdn')
+REPETITIONS = 3 # A position that comes up this many times with the same color to move is a draw
+
+WIN, DRAW, LOSS = 1, 0.5, 0 # Results for the first engine
+PDN_RESULTS = {WIN: '2-0', DRAW: '1-1', LOSS: '0-2'} # For white
+
+def parse_settings(text, allowed):
+# "name=value,name=value" to a dict, with the values as Python literals
+    values = {}
+    for item in filter(None, text.split(',')):
+        name, _, value = item.partition('=')
+        if name not in allowed:
+            raise ValueError(f"Unknown setting {name!r}, can be one of: {', '.join(allowed)}")
+        values[name] = ast.literal_eval(value)
+    return values
+
+def parse_engine(text):
+# "name:setting=value,..." to (name, settings)
+    name, _, values = text.partition(':')
+    return name, parse_settings(values, ENGINE_SETTINGS)
+
+def _set_settings(values):
+# Runs in every process before the engine is imported
+    from checkers import settings
+    for name, value in values.items():
+        setattr(settings, name, value)
+
+# Set in every engine process by _init_engine
+_table = None
+_ordering = None
+_tablebase = None
+
+def _init_engine(values):
+    global _table, _ordering, _tablebase
+    _set_settings(values)
+
+    from checkers import settings
+    from minimax.transposition import TranspositionTable
+    from minimax.ordering import MoveOrdering
+    from minimax.tablebase import Tablebase
+
+    # Every process keeps its table and ordering between moves, like the game does
+    _table = TranspositionTable(settings.transposition_table_size)
+    _ordering = MoveOrdering()
+    _tablebase = Tablebase.open()
+
+def _engine_move(masks, turn):
+# Runs in an engine process: searches the position with the engine's settings and returns the move and the searched nodes
+    from checkers import settings
+    from checkers.bitboard import BitBoard, mirror_move
+    from checkers.constants import AI_PLAYER
+    from minimax.algorithm import iterative_deepening
+    from minimax.stats import SearchStats
+
+    position = BitBoard(*masks)
+    mirrored = turn != AI_PLAYER
+    if mirrored:
+        position = position.mirrored()
+
+    _table.new_search()
+    _ordering.new_search()
+    stats = SearchStats()
+    _, move = iterative_deepening(position, settings.ai_depth, settings.ai_time_limit, settings.ai_node_limit, _table, _ordering, stats=stats, tablebase=_tablebase)
+    return (mirror_move(move) if mirrored else move), stats.nodes
+
+def random_openings(count, plies, rng):
+# Returns count FENs of positions after plies random moves from the start, where the game isn't over yet
+    from checkers.bitboard import BitBoard
+    from checkers.constants import WHITE, BLACK, DEFAULT_FEN
+
+    openings = []
+    while len(openings) < count:
+        position, turn = BitBoard.from_fen(DEFAULT_FEN)
+        for _ in range(plies):
+            moves = position.get_legal_moves(turn)
+            if not moves:
+                break
+            position.make_move(rng.choice(moves))
+            turn = BLACK if turn == WHITE else WHITE
+
+        if position.winner(turn) is None:
+            openings.append(position.get_fen(turn))
+
+    return openings
+
+class TournamentGame:
+    # A game in progress, played by the main process one move at a time with the moves of the engine processes
+    def __init__(self, number, opening, white, black):
+    # White and black are the numbers of the engines playing them
+        from checkers.bitboard import BitBoard
+        from checkers.constants import WHITE, BLACK
+
+        self.number = number
+        self.opening = opening
+        self.engines = {WHITE: white, BLACK: black}
+        self.position, self.turn = BitBoard.from_fen(opening)
+        self.first_turn = self.turn
+        self.moves = []
+        self.seen = {}
+        self.result = None # For white, once over
+
+    def engine(self):
+    # The engine on the move
+        return self.engines[self.turn]
+
+    def play(self, move, max_plies):
+    # Plays the move, and sets the result if the game ended
+        from checkers.constants import WHITE, BLACK
+
+        self.position.make_move(move)
+        self.moves.append(move)
+        self.turn = BLACK if self.turn == WHITE else WHITE
+
+        key = (self.position.hash, self.turn)
+        self.seen[key] = self.seen.get(key, 0) + 1
+
+        winner = self.position.winner(self.turn)
+        if winner is not None:
+            self.result = WIN if winner == WHITE else LOSS
+        elif self.seen[key] >= REPETITIONS or len(self.moves) >= max_plies:
+            self.result = DRAW
+
+    def pdn(self, names):
+    # The game in Portable Draughts Notation
+        from checkers.bitboard import move_notation
+        from checkers.constants import WHITE, BLACK
+
+        result = PDN_RESULTS[self.result]
+        lines = [
+            f'[Event "{names[0]} vs {names[1]}"]',
+            f'[Round "{self.number}"]',
+            f'[White "{names[self.engines[WHITE]]}"]',
+            f'[Black "{names[self.engines[BLACK]]}"]',
+            f'[Result "{result}"]',
+            f'[FEN "{self.opening}"]',
+            '',
+        ]
+
+        # Numbered by white's moves, so a game that starts with black's move starts with "1..."
+        text = []
+        ply = 0 if self.first_turn == WHITE else 1
+        if ply:
+            text.append("1...")
+        for move in self.moves:
+            if ply % 2 == 0:
+                text.append(f"{ply // 2 + 1}.")
+            text.append(move_notation(move))
+            ply += 1
+        text.append(result)
+
+        return '\n'.join(lines) + '\n' + ' '.join(text) + '\n\n'
+
+    def engine_result(self):
+    # The result for the first engine
+        from checkers.constants import WHITE
+        return self.result if self.engines[WHITE] == 0 else 1 - self.result
+
+def elo(wins, draws, losses):
+# Returns the Elo difference that the first engine's score shows, and the margin of error of 95% confidence,
+# found from the variance of the results of the games
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+
+    def score_to_elo(score):
+        if score <= 0:
+            return -math.inf
+        if score >= 1:
+            return math.inf
+        return 400 * math.log10(score / (1 - score))
+
+    difference = score_to_elo(score)
+    if math.isinf(difference):
+        return difference, math.inf
+    return difference, (score_to_elo(score + margin) - score_to_elo(score - margin)) / 2
+
+def report(names, results):
+    wins, draws, losses = results.count(WIN), results.count(DRAW), results.count(LOSS)
+    difference, margin = elo(wins, draws, losses)
+    return f"{names[0]} vs {names[1]}: {wins} wins, {draws} draws, {losses} losses, Elo {difference:+.1f} ± {margin:.1f}"
+
+def run(engines, rules, openings, max_plies, workers, output, log=print):
+# Plays every opening twice, with the engines switching colors, and returns the results of the first engine.
+# Every engine has a pool of processes, and as many games as there are workers are played at once, so every core is always searching.
+    names = [name for name, _ in engines]
+    context = multiprocessing.get_context('spawn')
+    pools = [context.Pool(workers, initializer=_init_engine, initargs=({**rules, **values},)) for _, values in engines]
+    done = queue.Queue() # (game, move and nodes) or (game, exception), filled by the pools' threads
+
+    def request_move(game):
+        masks = (game.position.white, game.position.black, game.position.kings)
+        pools[game.engine()].apply_async(_engine_move, (masks, game.turn),
+                                         callback=lambda result: done.put((game, result)),
+                                         error_callback=lambda error: done.put((game, error)))
+
+    pending = [TournamentGame(2 * index + swap + 1, opening, swap, 1 - swap) for index, opening in enumerate(openings) for swap in (0, 1)]
+    pending.reverse()
+    running = 0
+    results = []
+
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    try:
+        with open(output, 'w') as file:
+            while pending or running:
+                while pending and running < workers:
+                    request_move(pending.pop())
+                    running += 1
+
+                game, result = done.get()
+                if isinstance(result, BaseException):
+                    raise result
+
+                move, _ = result
+                game.play(move, max_plies)
+                if game.result is None:
+                    request_move(game)
+                    continue
+
+                running -= 1
+                results.append(game.engine_result())
+                file.write(game.pdn(names))
+                file.flush()
+                log(f"Game {len(results)}/{len(openings) * 2}: {report(names, results)}")
+    finally:
+        for pool in pools:
+            pool.terminate()
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays two engines with different settings against each other, and estimates the Elo difference.")
+    parser.add_argument('--engine', action='append', required=True,
+                        help=f"NAME[:SETTING=VALUE,...], twice. The settings can be: {', '.join(ENGINE_SETTINGS)}")
+    parser.add_argument('--rules', default='', help=f"SETTING=VALUE,... for both engines. The settings can be: {', '.join(RULES)}")
+    parser.add_argument('--games', type=int, default=100, help="How many games to play, rounded up to an even number")
+    parser.add_argument('--openings', help="A file of FENs to start the games from, one per line, instead of random openings")
+    parser.add_argument('--opening-plies', type=int, default=4, help="How many random moves every random opening has")
+    parser.add_argument('--depth', type=int, help="The default ai_depth of the engines. Default: the settings'")
+    parser.add_argument('--time', type=float, default=0.1, help="The default ai_time_limit of the engines, in seconds")
+    parser.add_argument('--nodes', type=int, help="The default ai_node_limit of the engines. Unlike time, doesn't depend on the load of the computer")
+    parser.add_argument('--max-plies', type=int, default=200, help="Games that get this long are draws")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="How many games are played at once. Default: one per core")
+    parser.add_argument('--seed', type=int, default=2021, help="For the random openings")
+    parser.add_argument('--output', default=OUTPUT_FILE, help="The file the games are saved to, in PDN")
+    args = parser.parse_args()
+
+    if len(args.engine) != 2:
+        parser.error("Give exactly two engines")
+    try:
+        engines = [parse_engine(engine) for engine in args.engine]
+        rules = parse_settings(args.rules, RULES)
+    except (ValueError, SyntaxError) as error:
+        parser.error(str(error))
+    if engines[0][0] == engines[1][0]:
+        parser.error("The engines need different names")
+
+    # The main process plays the moves, so it needs the same rules as the engines
+    _set_settings(rules)
+    from checkers import settings
+    from checkers.utility import read_fens
+
+    defaults = {'ai_depth': args.depth if args.depth is not None else settings.ai_depth, 'ai_time_limit': args.time, 'ai_node_limit': args.nodes}
+    engines = [(name, {**defaults, **values}) for name, values in engines]
+
+    if args.openings is not None:
+        openings = list(read_fens(args.openings))
+        openings = (openings * math.ceil(args.games / (2 * len(openings))))[:math.ceil(args.games / 2)]
+    else:
+        openings = random_openings(math.ceil(args.games / 2), args.opening_plies, random.Random(args.seed))
+
+    for name, values in engines:
+        print(f"{name}: {', '.join(f'{setting}={value!r}' for setting, value in values.items())}")
+    results = run(engines, rules, openings, args.max_plies, args.workers, args.output)
+    print(report([name for name, _ in engines], results))
+    print(f"Saved the games to {args.output}")
+
+if __name__ == '__main__':
+    main()